@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Import-Time Profile Report
+
+Runs ``python -X importtime`` for the client entry points and every bundled
+server in a fresh interpreter, then reports process start time, the
+cumulative import time of the target module itself (interpreter startup
+imports such as site and encodings are left out) and its slowest direct
+imports.
+
+Usage:
+    python benchmarks/import_profile.py --top 8
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Label -> module imported in the fresh interpreter
+TARGETS = {
+    "package": "src.mcp_project",
+    "client": "src.mcp_project.core.multi_server_client",
+    "openai (first query)": "openai",
+    "calculator": "src.mcp_project.servers.calculator",
+    "python_executor": "src.mcp_project.servers.python_excutor",
+    "file_processor": "src.mcp_project.servers.fileprocessor",
+    "shell_processor": "src.mcp_project.servers.shell_processor",
+}
+
+
+def profile_import(module: str) -> dict:
+    """
+    Import a module in a fresh interpreter with -X importtime
+
+    Parameters:
+        module: Module to import
+
+    Returns:
+        dict: Wall time, cumulative import time of the target, number of
+              modules it imported and its slowest direct imports
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    wall = time.perf_counter() - start
+
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nesting is shown by two spaces of indentation per level after the separator
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append({
+            "name": name.strip(),
+            "depth": depth,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+
+    # Children are listed before their parent, so everything the target pulled
+    # in is the block of lines after the previous top-level line. Earlier
+    # top-level lines (site, encodings, ...) belong to interpreter startup.
+    target = imports[-1] if imports and imports[-1]["name"] == module else None
+    block = []
+    if target:
+        for entry in reversed(imports[:-1]):
+            if entry["depth"] == 0:
+                break
+            block.append(entry)
+    direct = [entry for entry in block if entry["depth"] == 1]
+
+    return {
+        "wall_ms": wall * 1000,
+        # Cumulative time of the target alone, excluding interpreter startup imports
+        "import_ms": target["cumulative_ms"] if target else 0.0,
+        "modules": len(block) + 1 if target else 0,
+        "direct_imports": sorted(direct, key=lambda entry: entry["cumulative_ms"], reverse=True),
+    }
+
+
+def interpreter_start_ms(runs: int) -> float:
+    """Median wall time of starting an interpreter that imports nothing"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Import-time profile of the client and servers")
+    parser.add_argument("--top", type=int, default=5, help="Number of slowest direct imports to show")
+    parser.add_argument("--output", "-o", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    report = {"interpreter_start_ms": interpreter_start_ms(3), "targets": {}}
+    print(f"Bare interpreter start: {report['interpreter_start_ms']:.1f} ms\n")
+    print(f"{'target':<22}{'wall ms':>10}{'import ms':>12}{'modules':>10}")
+
+    for label, module in TARGETS.items():
+        result = profile_import(module)
+        report["targets"][label] = {"module": module, **result}
+        print(f"{label:<22}{result['wall_ms']:>10.1f}{result['import_ms']:>12.1f}{result['modules']:>10}")
+
+    for label, result in report["targets"].items():
+        print(f"\nSlowest direct imports of {label} ({result['module']}):")
+        for entry in result["direct_imports"][:args.top]:
+            print(f"  {entry['cumulative_ms']:>9.1f} ms  {entry['name']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Scripted OpenAI-Compatible LLM Stub
+
+A local HTTP server implementing POST /v1/chat/completions. Instead of
+calling a model it replays a fixed tool-call script chosen by the user
+query, so benchmark runs are deterministic and never touch a real API.
+
+The script step is derived from the number of tool results already in the
+conversation, so the stub keeps no per-conversation state and can serve
+any number of concurrent queries.
+
+Usage:
+    python benchmarks/llm_stub.py --port 8765
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+# Scenario name -> steps; each step is the list of tool calls made in one model turn
+SCENARIOS = {
+    "calc": [
+        [("add", {"numbers": [1, 2, 3.5]}), ("multiply", {"numbers": [2, 3, 4]})],
+        [("compare", {"a": 24, "b": "6.5"})],
+    ],
+    "python": [
+        [("execute_python_code", {"code": "print(sum(range(1000)))"})],
+    ],
+    "files": [
+        [("list_files", {"path": "src/mcp_project/servers"})],
+        [("read_file", {"file_path": "src/mcp_project/servers/calculator.py"})],
+    ],
+    "shell": [
+        [("execute_shell_command", {"command": "echo benchmark"})],
+    ],
+    "resource": [
+        [("read_resource", {"uri": "greeting://benchmark"})],
+        [("read_resource", {"uri": "greeting://benchmark"})],
+    ],
+    "chat": [],
+}
+
+
+def select_scenario(messages: List[dict]) -> str:
+    """
+    Pick the scenario named in the first user message
+
+    Parameters:
+        messages: Conversation messages
+
+    Returns:
+        str: Scenario name (defaults to "chat")
+    """
+    for message in messages:
+        if message.get("role") == "user":
+            text = str(message.get("content", "")).lower()
+            for name in SCENARIOS:
+                if name in text:
+                    return name
+            break
+    return "chat"
+
+
+def next_step(steps: list, messages: List[dict]) -> Optional[list]:
+    """
+    Find the script step that follows the tool results in the conversation
+
+    Parameters:
+        steps: Scenario steps
+        messages: Conversation messages
+
+    Returns:
+        Optional[list]: Tool calls of the next step, or None when the script is done
+    """
+    results = sum(1 for message in messages if message.get("role") == "tool")
+    consumed = 0
+    for step in steps:
+        if results == consumed:
+            return step
+        consumed += len(step)
+    return None
+
+
+def build_completion(request: dict, counter: int) -> dict:
+    """
+    Build a chat.completion response for a request
+
+    Parameters:
+        request: Decoded request body
+        counter: Sequence number used for response and tool call IDs
+
+    Returns:
+        dict: OpenAI chat.completion object
+    """
+    messages = request.get("messages", [])
+    scenario = select_scenario(messages)
+    step = next_step(SCENARIOS[scenario], messages)
+
+    if step:
+        message = {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_{counter}_{index}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": json.dumps(arguments)},
+                }
+                for index, (name, arguments) in enumerate(step)
+            ],
+        }
+        finish_reason = "tool_calls"
+    else:
+        message = {"role": "assistant", "content": f"Finished scenario '{scenario}'."}
+        finish_reason = "stop"
+
+    # Rough token estimate, stable across runs
+    prompt_tokens = len(json.dumps(messages)) // 4
+    completion_tokens = len(json.dumps(message)) // 4
+    return {
+        "id": f"chatcmpl-stub-{counter}",
+        "object": "chat.completion",
+        "created": 0,
+        "model": request.get("model", "stub"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+class LLMStub:
+    """Threaded local server replaying scripted completions"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        """
+        Initialize the stub
+
+        Parameters:
+            host: Bind address
+            port: TCP port (0 picks a free port)
+            latency: Seconds to sleep before each response, simulating a provider
+        """
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stub._lock:
+                    stub.requests += 1
+                    counter = stub.requests
+                if stub.latency:
+                    time.sleep(stub.latency)
+                payload = json.dumps(build_completion(json.loads(body), counter)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """OpenAI base URL of the stub"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "LLMStub":
+        """Serve requests from a daemon thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="llm-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "LLMStub":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scripted OpenAI-compatible LLM stub")
+    parser.add_argument("--port", "-p", type=int, default=8765, help="TCP port (0 picks a free port)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated response latency")
+    args = parser.parse_args()
+
+    stub = LLMStub(port=args.port, latency=args.latency_ms / 1000)
+    # Flushed right away, run_benchmarks.py reads the URL from a pipe
+    print(f"LLM stub listening on {stub.base_url} (scenarios: {', '.join(SCENARIOS)})", flush=True)
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
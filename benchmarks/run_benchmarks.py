@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+End-to-End Benchmark Suite
+
+Drives MultiServerClient against the real servers in
+src/mcp_project/servers, with the scripted LLM stub standing in for the
+OpenAI API from a separate process, and reports:
+
+- cold start: interpreter spawn + import + connecting to every server
+- tool call latency: p50/p99 of direct call_tool round trips
+- throughput: queries per second with concurrent process_query calls
+- per-query overhead: query time not spent in the LLM, waiting on the
+  LLM scheduler, or in tools
+- client RSS: peak resident memory of the benchmark process
+
+Results can be saved as a baseline and later runs compared against it.
+
+Usage:
+    python benchmarks/run_benchmarks.py --save-baseline stdio
+    python benchmarks/run_benchmarks.py --compare stdio
+    python benchmarks/run_benchmarks.py --transport in_process
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.mcp_project import MultiServerClient
+from src.mcp_project.utils.instrumentation import Instrumentation
+
+BASELINE_DIR = os.path.join(ROOT, "benchmarks", "baselines")
+SERVER_CONFIGS = {
+    "stdio": os.path.join("benchmarks", "config", "servers.stdio.json"),
+    "in_process": os.path.join("benchmarks", "config", "servers.in_process.json"),
+}
+
+# Tool calls timed in the latency benchmark
+TOOL_CALLS = [
+    ("add", {"numbers": [1, 2, 3]}),
+    ("compare", {"a": 3, "b": 2}),
+    ("execute_python_code", {"code": "x = 1 + 1"}),
+    ("list_files", {"path": "src/mcp_project/servers"}),
+]
+
+# Queries cycled through in the throughput benchmark (scenario names of the stub)
+QUERIES = ["calc", "python", "files", "resource"]
+
+# Metric -> True if higher is better
+METRICS = {
+    "cold_start_s": False,
+    "tool_p50_ms": False,
+    "tool_p99_ms": False,
+    "query_p50_ms": False,
+    "throughput_qps": True,
+    "overhead_per_query_ms": False,
+    "client_rss_mb": False,
+}
+
+
+def percentile(values: list, fraction: float) -> float:
+    """
+    Nearest-rank percentile
+
+    Parameters:
+        values: Samples
+        fraction: Percentile as a fraction, e.g. 0.99
+
+    Returns:
+        float: Percentile value
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+@contextmanager
+def llm_stub_process(latency_ms: float) -> Iterator[str]:
+    """
+    Run the LLM stub in its own process
+
+    Keeps the stub's CPU, memory and GIL time out of the client measurements.
+
+    Parameters:
+        latency_ms: Simulated LLM latency in milliseconds
+
+    Returns:
+        Iterator[str]: Stub base URL, the process is stopped on exit
+    """
+    command = [sys.executable, os.path.join(ROOT, "benchmarks", "llm_stub.py"),
+               "--port", "0", "--latency-ms", str(latency_ms)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    try:
+        # The stub prints "LLM stub listening on <base_url> (...)" once it accepts requests
+        line = process.stdout.readline()
+        if not line.startswith("LLM stub listening on "):
+            raise RuntimeError("LLM stub failed to start")
+        yield line.split()[4]
+    finally:
+        process.terminate()
+        process.wait()
+        process.stdout.close()
+
+
+def write_api_config(base_url: str) -> str:
+    """
+    Write a temporary API config pointing the client at the stub
+
+    Parameters:
+        base_url: Stub base URL
+
+    Returns:
+        str: Path to the config file
+    """
+    config = {
+        "openai_api": {
+            "api_key": "benchmark",
+            "base_url": base_url,
+            "model_name": "llm-stub",
+            "parameters": {"tool_choice": "auto"}
+        }
+    }
+    fd, path = tempfile.mkstemp(prefix="bench_api_", suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(config, f)
+    return path
+
+
+def bench_cold_start(servers_path: str, api_path: str, runs: int) -> float:
+    """
+    Time fresh processes from spawn until every server is connected
+
+    Parameters:
+        servers_path: Server configuration path
+        api_path: API configuration path
+        runs: Number of processes to start
+
+    Returns:
+        float: Median cold start time in seconds
+    """
+    command = [sys.executable, os.path.abspath(__file__), "--cold-start-child",
+               "--servers", servers_path, "--api", api_path]
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+async def cold_start_child(servers_path: str, api_path: str):
+    """Body of the cold start child process: connect to all servers, then exit"""
+    client = MultiServerClient(servers_path, api_path)
+    try:
+        if not await client.initialize():
+            raise SystemExit(1)
+    finally:
+        await client.cleanup()
+
+
+async def bench_tool_calls(client: MultiServerClient, calls: int) -> list:
+    """
+    Time direct tool calls, cycling through TOOL_CALLS
+
+    Parameters:
+        client: Initialized client
+        calls: Number of timed calls
+
+    Returns:
+        list: Latencies in milliseconds
+    """
+    # Warm up every tool once
+    for name, arguments in TOOL_CALLS:
+        await client.call_tool(name, arguments)
+
+    latencies = []
+    for index in range(calls):
+        name, arguments = TOOL_CALLS[index % len(TOOL_CALLS)]
+        start = time.perf_counter()
+        await client.call_tool(name, arguments)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def bench_queries(client: MultiServerClient, queries: int, concurrency: int) -> dict:
+    """
+    Run scripted queries end to end with bounded concurrency
+
+    Per-query overhead is only meaningful with a concurrency of 1, otherwise
+    query latencies also include time spent waiting on other queries.
+
+    Parameters:
+        client: Initialized client
+        queries: Number of queries
+        concurrency: Maximum queries in flight
+
+    Returns:
+        dict: Query p50 latency, throughput and per-query overhead
+    """
+    instrumentation = client.instrumentation
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(index: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await client.process_query(f"Run the {QUERIES[index % len(QUERIES)]} scenario")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    # Only spans from this phase count towards overhead
+    llm_before = instrumentation.total_seconds("llm.call")
+    wait_before = instrumentation.total_seconds("llm.wait")
+    tool_before = instrumentation.total_seconds("tool.call")
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(queries)))
+    elapsed = time.perf_counter() - start
+    llm_time = instrumentation.total_seconds("llm.call") - llm_before
+    wait_time = instrumentation.total_seconds("llm.wait") - wait_before
+    tool_time = instrumentation.total_seconds("tool.call") - tool_before
+
+    return {
+        "query_p50_ms": percentile(latencies, 0.5),
+        "throughput_qps": queries / elapsed,
+        "overhead_per_query_ms": max(0.0, sum(latencies) / 1000 - llm_time - wait_time - tool_time) / queries * 1000,
+    }
+
+
+async def run_suite(args) -> dict:
+    """
+    Run all benchmarks
+
+    Parameters:
+        args: Parsed command line arguments
+
+    Returns:
+        dict: Benchmark results
+    """
+    servers_path = args.servers or SERVER_CONFIGS[args.transport]
+
+    with llm_stub_process(args.llm_latency_ms) as base_url:
+        api_path = write_api_config(base_url)
+        try:
+            cold_start = bench_cold_start(servers_path, api_path, args.cold_runs)
+
+            client = MultiServerClient(servers_path, api_path, Instrumentation())
+            try:
+                if not await client.initialize():
+                    raise RuntimeError("Failed to connect to the benchmark servers")
+                latencies = await bench_tool_calls(client, args.calls)
+                # The first query pays for creating the OpenAI client, keep it out of the numbers
+                await client.process_query("Warm up with the chat scenario")
+                sequential = await bench_queries(client, args.queries, 1)
+                concurrent = await bench_queries(client, args.queries, args.concurrency)
+            finally:
+                await client.cleanup()
+        finally:
+            os.remove(api_path)
+
+    results = {
+        "cold_start_s": cold_start,
+        "tool_p50_ms": percentile(latencies, 0.5),
+        "tool_p99_ms": percentile(latencies, 0.99),
+        "query_p50_ms": sequential["query_p50_ms"],
+        "throughput_qps": concurrent["throughput_qps"],
+        "overhead_per_query_ms": sequential["overhead_per_query_ms"],
+        "client_rss_mb": peak_rss_mb(),
+    }
+    return {
+        "metrics": results,
+        "settings": {
+            "transport": args.transport,
+            "servers": servers_path,
+            "calls": args.calls,
+            "queries": args.queries,
+            "concurrency": args.concurrency,
+            "llm_latency_ms": args.llm_latency_ms,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compare results with a baseline
+
+    Parameters:
+        results: Current results
+        baseline: Saved baseline
+        threshold: Allowed relative regression, e.g. 0.2 for 20%
+
+    Returns:
+        list: Descriptions of regressed metrics
+    """
+    regressions = []
+    print(f"\n{'metric':<24}{'baseline':>12}{'current':>12}{'change':>10}")
+    for metric, higher_is_better in METRICS.items():
+        old = baseline["metrics"].get(metric)
+        new = results["metrics"].get(metric)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old if old else 0.0
+        regressed = -change > threshold if higher_is_better else change > threshold
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{metric:<24}{old:>12.3f}{new:>12.3f}{change:>+10.1%}{flag}")
+        if regressed:
+            regressions.append(f"{metric}: {old:.3f} -> {new:.3f} ({change:+.1%})")
+    return regressions
+
+
+def print_results(results: dict):
+    """Print a results table"""
+    settings = results["settings"]
+    print(f"\nTransport: {settings['transport']} ({settings['servers']})")
+    print(f"Tool calls: {settings['calls']}, queries: {settings['queries']}, concurrency: {settings['concurrency']}")
+    for metric, value in results["metrics"].items():
+        print(f"  {metric:<24}{value:>12.3f}")
+
+
+def main() -> int:
+    """Main function"""
+    parser = argparse.ArgumentParser(description="MCP client end-to-end benchmarks")
+    parser.add_argument("--transport", "-t", choices=list(SERVER_CONFIGS), default="stdio", help="Server transport to benchmark")
+    parser.add_argument("--servers", "-s", help="Custom server configuration file (overrides --transport)")
+    parser.add_argument("--calls", "-n", type=int, default=400, help="Number of timed tool calls")
+    parser.add_argument("--queries", "-q", type=int, default=40, help="Number of end-to-end queries")
+    parser.add_argument("--concurrency", "-c", type=int, default=8, help="Queries in flight at once")
+    parser.add_argument("--cold-runs", type=int, default=3, help="Number of cold start processes")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated LLM latency of the stub")
+    parser.add_argument("--output", "-o", help="Write results JSON to this path")
+    parser.add_argument("--save-baseline", metavar="NAME", help="Save results as benchmarks/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="Compare with benchmarks/baselines/NAME.json")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change counted as a regression")
+    parser.add_argument("--cold-start-child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--api", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR, format="%(levelname)s: %(message)s")
+    # Resolve user supplied paths against the caller's directory before leaving it
+    for name in ("servers", "api", "output"):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+    # Server configurations use paths relative to the repository root
+    os.chdir(ROOT)
+
+    if args.cold_start_child:
+        asyncio.run(cold_start_child(args.servers, args.api))
+        return 0
+
+    results = asyncio.run(run_suite(args))
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{args.save_baseline}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved baseline {path}")
+
+    if args.compare:
+        path = os.path.join(BASELINE_DIR, f"{args.compare}.json")
+        with open(path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions detected:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions detected")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Transport Latency Benchmark
+
+Compares per-call tool latency of the calculator server reached over
+stdio (subprocess) and in_process (in-memory streams). The in-process
+server is measured twice: with its sync tools run in a worker thread (the
+default) and called directly on the event loop.
+
+Usage:
+    python benchmarks/transport_latency.py --calls 500
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from contextlib import AsyncExitStack
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.mcp_project import ServerConnection
+
+SERVER_CONFIGS = {
+    "stdio": {
+        "type": "stdio",
+        "command": sys.executable,
+        "args": ["src/mcp_project/servers/calculator.py"],
+        "name": "Calculator (stdio)",
+    },
+    "in_process": {
+        "type": "in_process",
+        "module": "src.mcp_project.servers.calculator",
+        "attr": "mcp",
+        "name": "Calculator (in_process)",
+    },
+    "in_process_direct": {
+        "type": "in_process",
+        "module": "src.mcp_project.servers.calculator",
+        "attr": "mcp",
+        "name": "Calculator (in_process, direct)",
+        "offload_sync_tools": False,
+    },
+}
+
+
+async def bench_transport(transport: str, calls: int, warmup: int) -> dict:
+    """
+    Measure connect time and per-call latency for one transport
+
+    Parameters:
+        transport: Key of SERVER_CONFIGS
+        calls: Number of timed tool calls
+        warmup: Number of untimed calls made first
+
+    Returns:
+        dict: Timing results in milliseconds
+    """
+    async with AsyncExitStack() as exit_stack:
+        server = ServerConnection(transport, SERVER_CONFIGS[transport])
+
+        start = time.perf_counter()
+        if not await server.connect(exit_stack):
+            raise RuntimeError(f"Failed to connect using {transport} transport")
+        connect_ms = (time.perf_counter() - start) * 1000
+
+        arguments = {"numbers": [1.5, 2.5, 3.0]}
+        for _ in range(warmup):
+            await server.call_tool("add", arguments)
+
+        latencies = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            await server.call_tool("add", arguments)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    return {
+        "connect": connect_ms,
+        "mean": statistics.mean(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+async def main(calls: int, warmup: int):
+    """Run the benchmark for every transport and print a table"""
+    results = {}
+    for transport in SERVER_CONFIGS:
+        results[transport] = await bench_transport(transport, calls, warmup)
+
+    print(f"\n{calls} calls of calculator.add per transport (times in ms)")
+    print(f"{'transport':<20}{'connect':>10}{'mean':>10}{'p50':>10}{'p99':>10}")
+    for transport, r in results.items():
+        print(f"{transport:<20}{r['connect']:>10.2f}{r['mean']:>10.3f}{r['p50']:>10.3f}{r['p99']:>10.3f}")
+
+    print()
+    for transport in ("in_process", "in_process_direct"):
+        speedup = results["stdio"]["p50"] / results[transport]["p50"]
+        print(f"{transport} per-call speedup over stdio (p50): {speedup:.1f}x")
+    offload = results["in_process"]["p50"] - results["in_process_direct"]["p50"]
+    print(f"Worker thread cost per in_process call (p50): {offload:.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare stdio and in_process tool call latency")
+    parser.add_argument("--calls", "-n", type=int, default=200, help="Number of timed calls per transport")
+    parser.add_argument("--warmup", "-w", type=int, default=20, help="Number of warmup calls per transport")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.warmup))
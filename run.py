@@ -5,96 +5,64 @@ MCP Multi-Server Client Startup Script
 import asyncio
 import sys
 import os
-import json
+import logging
 import argparse
-from src.mcp_project import MultiServerClient
+from src.mcp_project.utils.load_config import ConfigError, load_client_config, load_dotenv_once
+from src.mcp_project.utils.instrumentation import (
+    Instrumentation,
+    JsonlFileExporter,
+    set_instrumentation,
+    start_prometheus_server,
+)
 
-# Try to import dotenv
-try:
-    from dotenv import load_dotenv
-    _has_dotenv = True
-except ImportError:
-    _has_dotenv = False
+logger = logging.getLogger("mcp_project")
 
-async def run(server_config_path: str = "config/servers.json", api_config_path: str = "config/api_config.json"):
+async def run(server_config_path: str = "config/servers.json", api_config_path: str = "config/api_config.json",
+              instrumentation: Instrumentation = None):
     """
     Run the multi-server client
     
     Parameters:
         server_config_path: Path to the server configuration file
         api_config_path: Path to the API configuration file
+        instrumentation: Tracing and metrics collector (optional)
     
     Returns:
         int: Exit code
     """
     # Try to load .env file
-    if _has_dotenv:
-        load_dotenv()
-        print("Loaded .env file (if it exists)")
+    if load_dotenv_once():
+        logger.info("Loaded .env file (if it exists)")
     else:
-        print("Tip: Install python-dotenv package to support .env files")
+        logger.info("Tip: Install python-dotenv package to support .env files")
     
     # Check critical environment variables
     if not os.getenv("OPENAI_API_KEY") and not os.path.exists(api_config_path):
-        print("Warning: OPENAI_API_KEY environment variable not found and API config file does not exist")
-        print("You can set the OPENAI_API_KEY environment variable or create a configuration file")
+        logger.warning("OPENAI_API_KEY environment variable not found and API config file does not exist")
+        logger.warning("You can set the OPENAI_API_KEY environment variable or create a configuration file")
     
-    # Check if server configuration file exists
-    if not os.path.exists(server_config_path):
-        print(f"Error: Server configuration file {server_config_path} does not exist")
-        print("Please create the configuration file first")
-        return 1
-    
-    # Validate server configuration file format
+    # Read and validate both configuration files once, the client reuses the result
     try:
-        with open(server_config_path, "r", encoding="utf-8") as f:
-            config = json.load(f)
-        
-        if "mcpServers" not in config:
-            print(f"Error: Configuration file {server_config_path} is invalid, missing 'mcpServers' section")
-            return 1
-    except json.JSONDecodeError:
-        print(f"Error: Configuration file {server_config_path} is not valid JSON format")
-        return 1
-    except Exception as e:
-        print(f"Error reading server configuration file: {str(e)}")
+        config = load_client_config(server_config_path, api_config_path)
+    except ConfigError as e:
+        logger.error("%s", e)
         return 1
     
-    # Check if API configuration file exists (optional)
-    if not os.path.exists(api_config_path):
-        print(f"Warning: API configuration file {api_config_path} does not exist, will use environment variables or default settings")
-    else:
-        # Validate API configuration file format
-        try:
-            with open(api_config_path, "r", encoding="utf-8") as f:
-                api_config = json.load(f)
-            
-            if "openai_api" not in api_config:
-                print(f"Warning: API configuration file {api_config_path} is invalid, missing 'openai_api' section, will use environment variables or default settings")
-            
-            # Check if API key is empty
-            if not api_config.get("openai_api", {}).get("api_key"):
-                if os.getenv("OPENAI_API_KEY"):
-                    print("Note: API key is empty in configuration file, will use OPENAI_API_KEY environment variable")
-                else:
-                    print("Warning: API key is empty in configuration file and OPENAI_API_KEY environment variable is not set")
-        except json.JSONDecodeError:
-            print(f"Warning: API configuration file {api_config_path} is not valid JSON format, will use environment variables or default settings")
-        except Exception as e:
-            print(f"Error reading API configuration file: {str(e)}, will use environment variables or default settings")
+    # Imported here so that argument parsing and config errors stay fast
+    from src.mcp_project import MultiServerClient
     
     # Create and initialize client
-    client = MultiServerClient(server_config_path, api_config_path)
+    client = MultiServerClient(server_config_path, api_config_path, instrumentation, config)
     try:
         # Initialize client
         if await client.initialize():
             # Run chat loop
             await client.chat_loop()
         else:
-            print("Failed to initialize client")
+            logger.error("Failed to initialize client")
             return 1
     except Exception as e:
-        print(f"Error during execution: {str(e)}")
+        logger.error("Error during execution: %s", e)
         return 1
     finally:
         # Clean up resources
@@ -108,16 +76,37 @@ def main():
     parser = argparse.ArgumentParser(description="MCP Multi-Server Client")
     parser.add_argument("--servers", "-s", help="Path to server configuration file", default="config/servers.json")
     parser.add_argument("--api", "-a", help="Path to API configuration file", default="config/api_config.json")
+    parser.add_argument("--log-level", "-l", help="Console log level", default="WARNING",
+                        choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    parser.add_argument("--trace-file", help="Append spans to this JSON Lines file")
+    parser.add_argument("--metrics-file", help="Write Prometheus text metrics to this file on exit")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
     args = parser.parse_args()
     
-    print("Starting MCP Multi-Server Client...")
-    print(f"Server configuration file: {args.servers}")
-    print(f"API configuration file: {args.api}")
+    logging.basicConfig(level=args.log_level, format="%(levelname)s: %(message)s")
+    
+    logger.info("Starting MCP Multi-Server Client...")
+    logger.info("Server configuration file: %s", args.servers)
+    logger.info("API configuration file: %s", args.api)
+    
+    # Set up tracing and metrics export
+    instrumentation = Instrumentation()
+    if args.trace_file:
+        instrumentation.add_exporter(JsonlFileExporter(args.trace_file))
+    set_instrumentation(instrumentation)
+    metrics_server = start_prometheus_server(instrumentation, args.metrics_port) if args.metrics_port else None
     
     # Run async main function
-    exit_code = asyncio.run(run(args.servers, args.api))
+    try:
+        exit_code = asyncio.run(run(args.servers, args.api, instrumentation))
+    finally:
+        if metrics_server:
+            metrics_server.shutdown()
+        if args.metrics_file:
+            instrumentation.write_prometheus_file(args.metrics_file)
+        instrumentation.close()
     
-    print("Client has exited")
+    logger.info("Client has exited")
     return exit_code
 
 if __name__ == "__main__":
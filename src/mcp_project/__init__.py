@@ -1,7 +1,13 @@
 """
 MCP Multi-Server Client Package
 """
-from .core import MultiServerClient, ServerConnection
-
 __version__ = "0.1.0"
-__all__ = ["MultiServerClient", "ServerConnection"] 
\ No newline at end of file
+__all__ = ["MultiServerClient", "ServerConnection"]
+
+
+def __getattr__(name):
+    # Import the client lazily so that importing the package stays cheap
+    if name in __all__:
+        from . import core
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,15 @@
 """
 MCP Client Core Package
 """
-from .multi_server_client import MultiServerClient
-from .server_connection import ServerConnection
+__all__ = ["MultiServerClient", "ServerConnection"]
 
-__all__ = ["MultiServerClient", "ServerConnection"] 
\ No newline at end of file
+
+def __getattr__(name):
+    # Defer importing openai and mcp until a class is actually used
+    if name == "MultiServerClient":
+        from .multi_server_client import MultiServerClient
+        return MultiServerClient
+    if name == "ServerConnection":
+        from .server_connection import ServerConnection
+        return ServerConnection
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
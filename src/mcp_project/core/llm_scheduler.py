@@ -0,0 +1,337 @@
+"""
+LLM Request Scheduler Module
+
+Every chat completion request made by MultiServerClient goes through one
+shared LLMScheduler, which:
+
+- limits requests and tokens per minute with token buckets
+- limits concurrent requests, adapting the limit to observed latency and errors
+  (additive increase while healthy, multiplicative decrease on errors)
+- retries rate limited and transient failures with jittered exponential
+  backoff, honoring the provider's Retry-After header
+- runs the blocking OpenAI client in a worker thread so the event loop keeps
+  serving tool calls and other queries
+"""
+import asyncio
+import email.utils
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, Optional
+
+from ..utils.instrumentation import Instrumentation, get_instrumentation
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes worth retrying
+RETRY_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """
+        Initialize the bucket
+
+        Parameters:
+            per_minute: Refill rate per minute
+            capacity: Maximum burst size (defaults to one minute of tokens)
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        """Add the tokens accumulated since the last update"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1):
+        """
+        Wait until the bucket holds enough tokens, then take them
+
+        Parameters:
+            amount: Number of tokens (capped at the bucket capacity)
+        """
+        amount = min(amount, self.capacity)
+        # The lock keeps waiters first come, first served
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, amount: float):
+        """
+        Give back (positive) or charge extra (negative) tokens after the fact
+
+        Parameters:
+            amount: Token correction, e.g. estimated minus actual usage
+        """
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class LLMScheduler:
+    """Shared rate limiter, adaptive concurrency limiter and retry loop for LLM calls"""
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 max_concurrency: int = 8, min_concurrency: int = 1, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 60.0, target_latency: float = 30.0,
+                 instrumentation: Optional[Instrumentation] = None):
+        """
+        Initialize the scheduler
+
+        Parameters:
+            requests_per_minute: Request rate limit (None for unlimited)
+            tokens_per_minute: Token rate limit (None for unlimited)
+            max_concurrency: Upper bound of concurrent requests
+            min_concurrency: Lower bound the adaptive limit never goes below
+            max_retries: Retries after the first attempt
+            base_delay: First backoff delay in seconds, doubled per retry
+            max_delay: Upper bound of a single backoff delay in seconds
+            target_latency: Request latency in seconds above which concurrency is reduced
+            instrumentation: Tracing and metrics collector (defaults to the shared instance)
+        """
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.target_latency = target_latency
+        self.instrumentation = instrumentation or get_instrumentation()
+
+        # Adaptive concurrency state
+        self.concurrency_limit = self.max_concurrency
+        self.in_flight = 0
+        self._successes = 0
+        self._condition: Optional[asyncio.Condition] = None
+        # Set from Retry-After so that every request waits, not only the throttled one
+        self._blocked_until = 0.0
+
+    @classmethod
+    def from_config(cls, config: dict, instrumentation: Optional[Instrumentation] = None) -> "LLMScheduler":
+        """
+        Create a scheduler from the "scheduler" section of api_config.json
+
+        Parameters:
+            config: Scheduler configuration dictionary
+            instrumentation: Tracing and metrics collector
+
+        Returns:
+            LLMScheduler: Scheduler
+        """
+        return cls(
+            requests_per_minute=config.get("requests_per_minute"),
+            tokens_per_minute=config.get("tokens_per_minute"),
+            max_concurrency=config.get("max_concurrency", 8),
+            min_concurrency=config.get("min_concurrency", 1),
+            max_retries=config.get("max_retries", 5),
+            base_delay=config.get("base_delay", 1.0),
+            max_delay=config.get("max_delay", 60.0),
+            target_latency=config.get("target_latency", 30.0),
+            instrumentation=instrumentation
+        )
+
+    async def submit(self, request: Callable[[], Any], estimated_tokens: int = 0,
+                     labels: Optional[Dict[str, str]] = None, **attributes) -> Any:
+        """
+        Run a blocking LLM request under the rate limits, retrying on failure
+
+        Each attempt is timed as an "llm.call" span, so LLM latency excludes
+        queueing. Time spent waiting for capacity or backing off is recorded
+        as "llm.wait" spans.
+
+        Parameters:
+            request: Function performing the request, run in a worker thread
+            estimated_tokens: Expected prompt + completion tokens, charged once up front
+            labels: Labels of the llm.call and llm.wait spans, e.g. the model name
+            attributes: Extra attributes recorded on each llm.call span
+
+        Returns:
+            Any: Result of the request
+
+        Raises:
+            Exception: The last error once retries are exhausted, or any non-retryable error
+        """
+        attempt = 0
+        while True:
+            with self.instrumentation.span("llm.wait", labels=labels, reason="capacity"):
+                # Tokens are charged once per request, retries only wait for a slot and the request rate
+                await self._wait_for_capacity(estimated_tokens if attempt == 0 else 0)
+            start = time.monotonic()
+            try:
+                with self.instrumentation.span("llm.call", labels=labels, attempt=attempt + 1, **attributes) as span:
+                    result = await asyncio.to_thread(request)
+                    span.set(**_usage_attributes(result))
+            except asyncio.CancelledError:
+                await self._release(0.0, failed=False, record=False)
+                raise
+            except Exception as e:
+                retryable, retry_after = _retry_decision(e)
+                # Non-retryable errors (bad requests) say nothing about provider load
+                await self._release(time.monotonic() - start, failed=retryable, record=retryable)
+                if not retryable or attempt >= self.max_retries:
+                    # The provider reports no usage for failed requests, give the estimate back
+                    if self.token_bucket and estimated_tokens:
+                        self.token_bucket.adjust(estimated_tokens)
+                    raise
+                delay = self._backoff_delay(attempt, retry_after)
+                if retry_after is not None:
+                    self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+                attempt += 1
+                self.instrumentation.count("llm.retries", labels={"reason": type(e).__name__})
+                logger.warning("LLM request failed (%s), retry %d/%d in %.1fs", e, attempt, self.max_retries, delay)
+                with self.instrumentation.span("llm.wait", labels=labels, reason="backoff"):
+                    await asyncio.sleep(delay)
+                continue
+
+            await self._release(time.monotonic() - start, failed=False)
+            self._settle_tokens(result, estimated_tokens)
+            return result
+
+    async def _wait_for_capacity(self, estimated_tokens: int):
+        """Wait for a concurrency slot, any Retry-After pause and both rate limits"""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.concurrency_limit)
+            self.in_flight += 1
+
+        try:
+            pause = self._blocked_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            if self.request_bucket:
+                await self.request_bucket.acquire(1)
+            if self.token_bucket and estimated_tokens:
+                await self.token_bucket.acquire(estimated_tokens)
+        except BaseException:
+            await self._release(0.0, failed=False, record=False)
+            raise
+
+    async def _release(self, latency: float, failed: bool, record: bool = True):
+        """Free a concurrency slot and adapt the limit to the outcome"""
+        async with self._condition:
+            self.in_flight -= 1
+            if record:
+                self._adapt(latency, failed)
+            self._condition.notify_all()
+
+    def _adapt(self, latency: float, failed: bool):
+        """AIMD: halve the limit on retryable errors, shrink it on slow responses, grow it slowly while healthy"""
+        previous = self.concurrency_limit
+        if failed:
+            self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit // 2)
+            self._successes = 0
+        elif latency > self.target_latency:
+            self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit - 1)
+            self._successes = 0
+        else:
+            self._successes += 1
+            # One step up per window of successful requests at the current limit
+            if self._successes >= self.concurrency_limit:
+                self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1)
+                self._successes = 0
+
+        if self.concurrency_limit != previous:
+            logger.info("LLM concurrency limit %d -> %d", previous, self.concurrency_limit)
+
+    def _settle_tokens(self, result: Any, estimated_tokens: int):
+        """Correct the token bucket with the usage reported by the provider"""
+        usage = getattr(result, "usage", None)
+        total = getattr(usage, "total_tokens", None) if usage else None
+        if self.token_bucket and total is not None:
+            self.token_bucket.adjust(estimated_tokens - total)
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+def _usage_attributes(result: Any) -> dict:
+    """
+    Read the token usage reported with a response
+
+    Parameters:
+        result: Chat completion response
+
+    Returns:
+        dict: Prompt, completion and total token counts, empty if not reported
+    """
+    usage = getattr(result, "usage", None)
+    if not usage:
+        return {}
+    prompt = getattr(usage, "prompt_tokens", 0) or 0
+    completion = getattr(usage, "completion_tokens", 0) or 0
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+def _retry_decision(error: Exception) -> tuple:
+    """
+    Decide whether a failed request should be retried
+
+    Parameters:
+        error: Exception raised by the request
+
+    Returns:
+        tuple: (retryable, Retry-After in seconds or None)
+    """
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        if status not in RETRY_STATUS_CODES:
+            return False, None
+        response = getattr(error, "response", None)
+        return True, _parse_retry_after(getattr(response, "headers", None))
+
+    # Connection errors and timeouts carry no status code
+    try:
+        from openai import APIConnectionError
+    except ImportError:
+        APIConnectionError = ()
+    return isinstance(error, (APIConnectionError, ConnectionError, TimeoutError)), None
+
+
+def _parse_retry_after(headers: Any) -> Optional[float]:
+    """
+    Read the delay requested by the provider
+
+    Parameters:
+        headers: Response headers
+
+    Returns:
+        Optional[float]: Delay in seconds, or None if not given
+    """
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # Retry-After may also be an HTTP date
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -2,57 +2,88 @@
 Multi-Server Client Core Module
 """
 import json
+import logging
 import os
 from typing import Dict, Optional, Any
 from contextlib import AsyncExitStack
-from openai import OpenAI
-from ..utils.load_config import load_api_config
-from pprint import pp
-# Import dotenv support
-try:
-    from dotenv import load_dotenv
-    _has_dotenv = True
-except ImportError:
-    _has_dotenv = False
+from ..utils.load_config import ClientConfig, ConfigError, load_api_config, load_dotenv_once, load_server_config
+from ..utils.resource_cache import ResourceCache
+from ..utils.instrumentation import Instrumentation, get_instrumentation
 
 from .server_connection import ServerConnection
+from .llm_scheduler import LLMScheduler
+
+logger = logging.getLogger(__name__)
+
+# Name of the client-side tool that lets the model read server resources
+READ_RESOURCE_TOOL = "read_resource"
 
 
 class MultiServerClient:
     """Multi-Server Client Class"""
     
-    def __init__(self, config_path: str = "config/servers.json", api_config_path: str = "config/api_config.json"):
+    def __init__(self, config_path: str = "config/servers.json", api_config_path: str = "config/api_config.json",
+                 instrumentation: Optional[Instrumentation] = None, config: Optional[ClientConfig] = None):
         """
         Initialize multi-server client
         
         Parameters:
             config_path: Path to server configuration file
             api_config_path: Path to API configuration file
+            instrumentation: Tracing and metrics collector (defaults to the shared instance)
+            config: Already loaded configuration; when given the files are not read again
         """
         # Try to load .env file
-        if _has_dotenv:
-            load_dotenv()
+        load_dotenv_once()
         
         # Initialize variables
         self.servers: Dict[str, ServerConnection] = {}
         self.config_path = config_path
         self.api_config_path = api_config_path
         self.exit_stack = AsyncExitStack()
+        self.instrumentation = instrumentation or get_instrumentation()
+        self.config = config
+        
+        # Exact resource URI -> server, built after connecting
+        self.resource_index: Dict[str, ServerConnection] = {}
+        self.resource_cache = ResourceCache()
         
         # Load API configuration
-        self.api_config = load_api_config(self.api_config_path)
+        self.api_config = config.api if config else load_api_config(self.api_config_path)
         
-        # Initialize OpenAI client
-        self.client = OpenAI(
-            api_key=self.api_config.get("openai_api", {}).get("api_key", os.getenv("OPENAI_API_KEY")),
-            base_url=self.api_config.get("openai_api", {}).get("base_url", os.getenv("OPENAI_BASE_URL"))
-        )
+        # The OpenAI client is created on first use, see the client property
+        self._client = None
         
         # Get model name and parameters
         self.model_name = self.api_config.get("openai_api", {}).get("model_name", os.getenv("OPENAI_MODEL_NAME", "Qwen/Qwen2.5-7B-Instruct"))
         self.api_parameters = self.api_config.get("openai_api", {}).get("parameters", {})
+        
+        # Shared rate limiting, retry and concurrency control for all LLM calls
+        self.scheduler = LLMScheduler.from_config(
+            self.api_config.get("openai_api", {}).get("scheduler", {}), self.instrumentation
+        )
     
-
+    @property
+    def client(self):
+        """
+        OpenAI client, imported and created on first use to keep startup fast
+        
+        Returns:
+            OpenAI: OpenAI client
+        """
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(
+                api_key=self.api_config.get("openai_api", {}).get("api_key", os.getenv("OPENAI_API_KEY")),
+                base_url=self.api_config.get("openai_api", {}).get("base_url", os.getenv("OPENAI_BASE_URL")),
+                # Retries are handled by the scheduler
+                max_retries=0
+            )
+        return self._client
+    
+    @client.setter
+    def client(self, value):
+        self._client = value
     
     async def initialize(self):
         """
@@ -61,25 +92,29 @@ class MultiServerClient:
         Returns:
             bool: Whether initialization was successful
         """
-        # Load configuration
-        try:
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                config_data = json.load(f)
-            
-            # Get server configurations
-            server_configs = config_data.get("mcpServers", {})
-            if not server_configs:
-                print("Warning: 'mcpServers' section not found in configuration file")
+        # Load configuration, unless it was passed in already parsed
+        if self.config is None:
+            try:
+                self.config = ClientConfig(load_server_config(self.config_path), self.api_config)
+            except ConfigError as e:
+                logger.error("Error loading configuration file: %s", e)
                 return False
-                
-        except Exception as e:
-            print(f"Error loading configuration file: {str(e)}")
-            return False
+        server_configs = self.config.servers
+        
+        # Optional resource cache settings
+        cache_config = self.config.resource_cache
+        self.resource_cache = ResourceCache(
+            ttl=cache_config.get("ttl", 60.0),
+            max_entries=cache_config.get("max_entries", 128),
+            max_bytes=cache_config.get("max_bytes", 4 * 1024 * 1024)
+        )
+        
         total_tools=[]
         total_resources=[]
+        total_templates=[]
         # Create server connections
         for server_id, server_config in server_configs.items():
-            server = ServerConnection(server_id, server_config)
+            server = ServerConnection(server_id, server_config, self.instrumentation)
             self.servers[server_id] = server
         
         # Connect to all servers
@@ -89,15 +124,31 @@ class MultiServerClient:
                 connected_servers += 1
                 total_tools.extend(server.tools)
                 total_resources.extend(server.resources)
+                total_templates.extend(server.resource_templates)
         if connected_servers == 0:
-            print("Warning: Failed to connect to any servers")
+            logger.warning("Failed to connect to any servers")
             return False
         
-        print(f"Successfully connected to {connected_servers}/{len(self.servers)} servers.")
-        pp(f"Available tools: { [tool.name for tool in total_tools]}")
-        pp(f"Available resources: { [resource.pattern for resource in total_resources]}")
+        self._build_resource_index()
+        
+        logger.info("Successfully connected to %d/%d servers.", connected_servers, len(self.servers))
+        logger.info("Available tools: %s", [tool.name for tool in total_tools])
+        logger.info("Available resources: %s", [str(resource.uri) for resource in total_resources])
+        logger.info("Available resource templates: %s", [template.uriTemplate for template in total_templates])
         return True
     
+    def _build_resource_index(self):
+        """
+        Index exact resource URIs of all connected servers
+        
+        The first server that lists a URI owns it, matching tool routing.
+        """
+        self.resource_index = {}
+        for server in self.servers.values():
+            for resource in server.resources:
+                self.resource_index.setdefault(str(resource.uri), server)
+        self.resource_cache.invalidate()
+    
     def find_server_for_tool(self, tool_name: str) -> Optional[ServerConnection]:
         """
         Find server that provides the specified tool
@@ -113,6 +164,95 @@ class MultiServerClient:
                 return server
         return None
     
+    def find_server_for_resource(self, uri: str) -> Optional[ServerConnection]:
+        """
+        Find server that provides the specified resource URI
+        
+        Exact URIs are looked up in the index first, then resource templates
+        are matched in server order.
+        
+        Parameters:
+            uri: Resource URI
+            
+        Returns:
+            Optional[ServerConnection]: Server that provides the resource
+        """
+        server = self.resource_index.get(uri)
+        if server:
+            return server
+        for server in self.servers.values():
+            if server.matches_resource_template(uri):
+                return server
+        return None
+    
+    async def read_resource(self, uri: str, use_cache: bool = True) -> Any:
+        """
+        Read a resource from whichever server provides it
+        
+        Parameters:
+            uri: Resource URI
+            use_cache: Whether to serve and store the result in the resource cache
+            
+        Returns:
+            Any: Resource read result
+        """
+        if use_cache:
+            cached = self.resource_cache.get(uri)
+            if cached is not None:
+                self.instrumentation.count("resource.cache", labels={"result": "hit"})
+                return cached
+            self.instrumentation.count("resource.cache", labels={"result": "miss"})
+        
+        server = self.find_server_for_resource(uri)
+        if not server:
+            raise ValueError(f"No server provides resource '{uri}'")
+        
+        with self.instrumentation.span("resource.read", labels={"server": server.server_id}, uri=uri):
+            result = await server.read_resource(uri)
+        if use_cache:
+            self.resource_cache.put(uri, result)
+        return result
+    
+    def get_resource_tool(self) -> Optional[dict]:
+        """
+        Build the read_resource tool definition exposed to the model
+        
+        Returns:
+            Optional[dict]: OpenAI tool definition, or None if no server has resources
+        """
+        uris = list(self.resource_index)
+        templates = [
+            template.uriTemplate
+            for server in self.servers.values()
+            for template in server.resource_templates
+        ]
+        if not uris and not templates:
+            return None
+        
+        description = "Read a resource provided by the connected servers."
+        if uris:
+            description += f" Available resources: {', '.join(uris)}."
+        if templates:
+            description += f" Resource templates (replace {{...}} with a value): {', '.join(templates)}."
+        
+        return {
+            "type": "function",
+            "function": {
+                "name": READ_RESOURCE_TOOL,
+                "description": description,
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "uri": {
+                            "type": "string",
+                            "description": "URI of the resource to read"
+                        }
+                    },
+                    "required": ["uri"]
+                }
+            }
+        }
+    
     async def call_tool(self, tool_name: str, arguments: dict) -> Any:
         """
         Call any available tool
@@ -123,12 +263,29 @@ class MultiServerClient:
             
         Returns:
             Any: Tool call result
+            
+        Raises:
+            ToolArgumentError: If the arguments do not match the tool's input schema
         """
         server = self.find_server_for_tool(tool_name)
+        if not server and tool_name == READ_RESOURCE_TOOL:
+            if not isinstance(arguments, dict) or not isinstance(arguments.get("uri"), str):
+                raise ValueError(f"Tool '{READ_RESOURCE_TOOL}' requires a string 'uri' argument")
+            with self.instrumentation.span("tool.call", labels={"tool": tool_name, "server": "client"}):
+                result = await self.read_resource(arguments["uri"])
+            return _format_resource_contents(result)
         if not server:
             raise ValueError(f"No server provides tool '{tool_name}'")
         
-        return await server.call_tool(tool_name, arguments)
+        # Reject malformed arguments locally instead of paying a server round trip
+        validator = server.get_tool_validator(tool_name)
+        if validator:
+            arguments = validator.validate(arguments)
+        
+        with self.instrumentation.span("tool.call", labels={"tool": tool_name, "server": server.server_id}) as span:
+            result = await server.call_tool(tool_name, arguments)
+            span.set(is_error=bool(getattr(result, "isError", False)))
+        return result
     
     async def process_query(self, query: str) -> str:
         """
@@ -160,15 +317,20 @@ class MultiServerClient:
                     }
                 })
         
-        print(f"Total available tools: {len(available_tools)}")
-        print("Initial messages:", messages)
+        # Let the model read resources and resource templates through a tool
+        resource_tool = self.get_resource_tool()
+        if resource_tool and not self.find_server_for_tool(READ_RESOURCE_TOOL):
+            available_tools.append(resource_tool)
+        
+        logger.debug("Total available tools: %d", len(available_tools))
+        logger.debug("Initial messages: %s", messages)
         
         # Process results and possible tool calls
         final_text = []
         
         while True:
             # Call OpenAI API
-            print("Calling OpenAI API...")
+            logger.debug("Calling OpenAI API...")
             
             # Prepare API parameters
             api_params = self.api_parameters.copy()
@@ -178,7 +340,16 @@ class MultiServerClient:
                 "tools": available_tools
             })
             
-            response = self.client.chat.completions.create(**api_params)
+            client = self.client
+            # The scheduler records the llm.call (request) and llm.wait (queueing, backoff) spans
+            response = await self.scheduler.submit(
+                lambda: client.chat.completions.create(**api_params),
+                estimated_tokens=self._estimate_tokens(messages, available_tools),
+                labels={"model": self.model_name},
+                messages=len(messages),
+                tools=len(available_tools)
+            )
+            self._record_usage(response)
             
             # Get model response
             assistant_message = response.choices[0].message
@@ -188,7 +359,7 @@ class MultiServerClient:
             if assistant_content:
                 final_text.append(assistant_content)
                 # messages.extend([{"role": "assistant", "content": assistant_content}])
-                print(f"Model response: {assistant_content}")
+                logger.debug("Model response: %s", assistant_content)
             
             # Check if there are tool calls
             tool_calls = assistant_message.tool_calls
@@ -201,44 +372,55 @@ class MultiServerClient:
                 function_name = tool_call.function.name
                 function_args = tool_call.function.arguments
                 
-                print(f"Calling tool: {function_name}, arguments: {function_args}")
+                logger.info("Calling tool: %s, arguments: %s", function_name, function_args)
+                
+                # Record the tool call so that both results and errors have a matching call
+                messages.append({
+                    "role": "assistant",
+                    "content": assistant_content,
+                    "tool_calls": [
+                        {
+                            "id": tool_call.id,
+                            "type": "function",
+                            "function": {
+                                "name": function_name,
+                                "arguments": function_args
+                            }
+                        }
+                    ]
+                })
                 
                 # Execute tool call
                 try:
                     # Convert string JSON to Python dictionary
-                    args_dict = json.loads(function_args)
+                    try:
+                        with self.instrumentation.span("json.decode", labels={"tool": function_name},
+                                                       payload_bytes=len(function_args or "")):
+                            args_dict = json.loads(function_args) if function_args else {}
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f"Arguments for tool '{function_name}' are not valid JSON: {e}")
                     
                     # Call tool
                     result = await self.call_tool(function_name, args_dict)
                     final_text.append(f"[Called tool {function_name} with arguments {function_args}]")
                     
-                    # Add tool call result to message history
-                    messages.append({
-                        "role": "assistant",
-                        "content": assistant_content,
-                        "tool_calls": [
-                            {
-                                "id": tool_call.id,
-                                "type": "function",
-                                "function": {
-                                    "name": function_name,
-                                    "arguments": function_args
-                                }
-                            }
-                        ]
-                    })
+                    # Ensure result is a string, the text is the result's repr rather than JSON
+                    with self.instrumentation.span("result.format", labels={"tool": function_name}) as span:
+                        content = str(result)
+                        span.set(payload_bytes=len(content))
                     
+                    # Add tool call result to message history
                     messages.append({
                         "role": "tool",
                         "tool_call_id": tool_call.id,
-                        "content": str(result)  # Ensure result is a string
+                        "content": content
                     })
                     
-                    print(f"Tool returned result: {result}")
+                    logger.debug("Tool returned result: %s", content)
                 except Exception as e:
                     error_msg = f"Tool call failed: {str(e)}"
                     final_text.append(error_msg)
-                    print(error_msg)
+                    logger.warning(error_msg)
                     
                     # Add error information to message history
                     messages.append({
@@ -252,6 +434,39 @@ class MultiServerClient:
         # Return all results
         return "\n".join(final_text)
     
+    def _estimate_tokens(self, messages: list, tools: list) -> int:
+        """
+        Roughly estimate prompt plus completion tokens of a request for rate limiting
+        
+        Parameters:
+            messages: Conversation messages
+            tools: Tool definitions sent with the request
+            
+        Returns:
+            int: Estimated token count (about 4 characters per token)
+        """
+        characters = sum(len(str(message.get("content") or "")) + len(str(message.get("tool_calls") or ""))
+                         for message in messages)
+        characters += sum(len(str(tool)) for tool in tools)
+        return characters // 4 + int(self.api_parameters.get("max_tokens", 0))
+    
+    def _record_usage(self, response):
+        """
+        Add token counts from an API response to the token counters
+        
+        Parameters:
+            response: Chat completion response
+        """
+        usage = getattr(response, "usage", None)
+        if not usage:
+            return
+        tokens = {
+            "prompt": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion": getattr(usage, "completion_tokens", 0) or 0,
+        }
+        for kind, value in tokens.items():
+            self.instrumentation.count("llm.tokens", value, labels={"model": self.model_name, "kind": kind})
+    
     async def chat_loop(self):
         """
         Run interactive conversation loop
@@ -276,4 +491,24 @@ class MultiServerClient:
         """
         Clean up resources
         """
-        await self.exit_stack.aclose() 
\ No newline at end of file
+        await self.exit_stack.aclose()
+
+
+def _format_resource_contents(result: Any) -> str:
+    """
+    Convert a resource read result into text for the model
+    
+    Parameters:
+        result: Resource read result
+        
+    Returns:
+        str: Text contents, with binary contents summarized
+    """
+    parts = []
+    for content in result.contents:
+        text = getattr(content, "text", None)
+        if text is not None:
+            parts.append(text)
+        else:
+            parts.append(f"[Binary content {content.uri} ({content.mimeType or 'unknown type'})]")
+    return "\n".join(parts)
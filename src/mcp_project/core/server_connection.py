@@ -1,24 +1,117 @@
 """
 Single Server Connection Module
 """
+import functools
+import importlib
+import logging
+import re
 from pathlib import Path
-from typing import Optional, Any
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Any, Pattern
 from contextlib import AsyncExitStack
 
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from ..utils.schema_validator import SchemaValidator
+from ..utils.instrumentation import Instrumentation, get_instrumentation
+
+if TYPE_CHECKING:
+    from mcp import ClientSession
+
+logger = logging.getLogger(__name__)
+
+
+def _compile_uri_template(uri_template: str) -> Pattern:
+    """
+    Compile an RFC 6570 style URI template such as greeting://{name} into a regex
+    
+    Parameters:
+        uri_template: URI template
+        
+    Returns:
+        Pattern: Regex matching URIs produced by the template
+    """
+    parts = []
+    for literal, variable in re.findall(r"([^{]*)(?:\{([^}]*)\})?", uri_template):
+        parts.append(re.escape(literal))
+        if variable:
+            # {+var} allows reserved characters such as "/", plain {var} does not
+            parts.append(".+" if variable.startswith("+") else "[^/]+")
+    return re.compile("".join(parts))
+
+
+def _offload_sync_tools(app: Any) -> Callable[[], None]:
+    """
+    Run the sync tools of an in-process FastMCP app in a worker thread
+    
+    FastMCP calls sync tools directly on the event loop, which would stall the
+    whole client while a tool runs. Sync tool functions are wrapped so that
+    they run in a worker thread instead. A sync tool raising SystemExit (or any
+    other BaseException) fails the call instead of ending the client. Async
+    tools keep running on the client loop.
+    
+    Parameters:
+        app: FastMCP app (anything else is left unchanged)
+        
+    Returns:
+        Callable[[], None]: Function restoring the original tool functions
+    """
+    tool_manager = getattr(app, "_tool_manager", None)
+    if tool_manager is None:
+        return lambda: None
+    
+    wrapped = []
+    for tool in tool_manager.list_tools():
+        if tool.is_async:
+            continue
+        wrapped.append((tool, tool.fn))
+        tool.fn = _run_in_thread(tool.fn)
+        tool.is_async = True
+    
+    def restore():
+        for tool, fn in wrapped:
+            tool.fn = fn
+            tool.is_async = False
+    
+    return restore
+
+
+def _run_in_thread(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a sync tool function into a coroutine function running it in a worker thread
+    
+    Parameters:
+        fn: Sync tool function
+        
+    Returns:
+        Callable[..., Any]: Async tool function
+    """
+    import anyio
+    
+    def isolated(kwargs: dict) -> Any:
+        try:
+            return fn(**kwargs)
+        except Exception:
+            raise
+        except BaseException as e:
+            # Turned into an ordinary tool error by FastMCP
+            raise RuntimeError(f"Tool aborted with {type(e).__name__}: {e}") from e
+    
+    @functools.wraps(fn)
+    async def wrapper(**kwargs):
+        return await anyio.to_thread.run_sync(isolated, kwargs)
+    
+    return wrapper
 
 
 class ServerConnection:
     """Single Server Connection Class"""
     
-    def __init__(self, server_id: str, config: dict):
+    def __init__(self, server_id: str, config: dict, instrumentation: Optional[Instrumentation] = None):
         """
         Initialize server connection
         
         Parameters:
             server_id: Server ID
             config: Server configuration dictionary
+            instrumentation: Tracing and metrics collector (defaults to the shared instance)
         """
         self.server_id = server_id
         self.name = config.get("name", server_id)
@@ -26,12 +119,23 @@ class ServerConnection:
         self.command = config.get("command", "python")
         self.args = config.get("args", [])
         self.enabled = config.get("enable", True)
+        # Transport type: "stdio" (subprocess) or "in_process" (imported FastMCP app)
+        self.type = config.get("type", "stdio")
+        self.module = config.get("module", "")
+        self.attr = config.get("attr", "mcp")
+        # Run sync tools of in-process servers in a worker thread
+        self.offload_sync_tools = config.get("offload_sync_tools", True)
+        self.instrumentation = instrumentation or get_instrumentation()
         
         # Initialize session
-        self.session: Optional[ClientSession] = None
+        self.session: Optional["ClientSession"] = None
         self.exit_stack = None
         self.tools = []
         self.resources = []
+        self.resource_templates = []
+        self._template_patterns: List[Pattern] = []
+        # Compiled argument validators, keyed by tool name
+        self._validators: Dict[str, SchemaValidator] = {}
     
     async def connect(self, exit_stack: AsyncExitStack):
         """
@@ -44,14 +148,38 @@ class ServerConnection:
             bool: Whether connection was successful
         """
         if not self.enabled:
-            print(f"Server {self.name} ({self.server_id}) is disabled, skipping connection")
+            logger.info("Server %s (%s) is disabled, skipping connection", self.name, self.server_id)
             return False
         
+        with self.instrumentation.span("server.connect", labels={"server": self.server_id, "transport": self.type}) as span:
+            if self.type == "in_process":
+                connected = await self._connect_in_process(exit_stack)
+            else:
+                connected = await self._connect_stdio(exit_stack)
+            if connected:
+                span.set(tools=len(self.tools), resources=len(self.resources))
+            else:
+                span.status = "error"
+        return connected
+    
+    async def _connect_stdio(self, exit_stack: AsyncExitStack) -> bool:
+        """
+        Connect to the server by spawning it as a subprocess speaking stdio
+        
+        Parameters:
+            exit_stack: Async exit stack
+            
+        Returns:
+            bool: Whether connection was successful
+        """
         # Check if the first argument (script path) exists
         if self.args and not Path(self.args[0]).exists():
-            print(f"Error: Server script {self.args[0]} does not exist, skipping connection")
+            logger.error("Server script %s does not exist, skipping connection", self.args[0])
             return False
         
+        from mcp import ClientSession, StdioServerParameters
+        from mcp.client.stdio import stdio_client
+        
         try:
             self.exit_stack = exit_stack
             
@@ -70,21 +198,72 @@ class ServerConnection:
             # Initialize connection
             await self.session.initialize()
             
-            # Get tools and resources list
-            tools_response = await self.session.list_tools()
-            self.tools = tools_response.tools
+            await self._load_capabilities()
+            
+            logger.info("Successfully connected to server %s (%s)", self.name, self.server_id)
+            return True
+        except Exception as e:
+            logger.error("Error connecting to server %s (%s): %s", self.name, self.server_id, e)
+            return False
+    
+    async def _connect_in_process(self, exit_stack: AsyncExitStack) -> bool:
+        """
+        Connect to a FastMCP app imported into this process over in-memory streams
+        
+        Parameters:
+            exit_stack: Async exit stack
+            
+        Returns:
+            bool: Whether connection was successful
+        """
+        from mcp.shared.memory import create_connected_server_and_client_session
+        
+        try:
+            self.exit_stack = exit_stack
+            
+            # Import the FastMCP object, e.g. src.mcp_project.servers.calculator:mcp
+            module = importlib.import_module(self.module)
+            app = getattr(module, self.attr)
+            # FastMCP wraps a low-level server, which may also be exported directly
+            server = getattr(app, "_mcp_server", app)
+            if self.offload_sync_tools:
+                # Undone when the connection closes, the app object belongs to the imported module
+                exit_stack.callback(_offload_sync_tools(app))
             
-            resources_response = await self.session.list_resources()
-            self.resources = resources_response.resources
+            # The returned session is already initialized
+            self.session = await exit_stack.enter_async_context(
+                create_connected_server_and_client_session(server)
+            )
             
-            print(f"Successfully connected to server {self.name} ({self.server_id})")
-
+            await self._load_capabilities()
             
+            logger.info("Successfully connected to in-process server %s (%s)", self.name, self.server_id)
             return True
         except Exception as e:
-            print(f"Error connecting to server {self.name} ({self.server_id}): {str(e)}")
+            logger.error("Error connecting to in-process server %s (%s): %s", self.name, self.server_id, e)
             return False
     
+    async def _load_capabilities(self):
+        """
+        Fetch the tools and resources list from the connected session
+        """
+        tools_response = await self.session.list_tools()
+        self.tools = tools_response.tools
+        self._validators.clear()
+        
+        resources_response = await self.session.list_resources()
+        self.resources = resources_response.resources
+        
+        # Resource templates are optional, not every server implements them
+        try:
+            templates_response = await self.session.list_resource_templates()
+            self.resource_templates = templates_response.resourceTemplates
+        except Exception:
+            self.resource_templates = []
+        self._template_patterns = [
+            _compile_uri_template(template.uriTemplate) for template in self.resource_templates
+        ]
+    
     async def call_tool(self, tool_name: str, arguments: dict) -> Any:
         """
         Call a tool
@@ -128,6 +307,18 @@ class ServerConnection:
         """
         return any(tool.name == tool_name for tool in self.tools)
     
+    def matches_resource_template(self, uri: str) -> bool:
+        """
+        Check if a URI matches one of the server's resource templates
+        
+        Parameters:
+            uri: Resource URI
+            
+        Returns:
+            bool: Whether a template matches the URI
+        """
+        return any(pattern.fullmatch(uri) for pattern in self._template_patterns)
+    
     def get_tool_schema(self, tool_name: str) -> Optional[dict]:
         """
         Get the input schema for a tool
@@ -141,5 +332,25 @@ class ServerConnection:
         for tool in self.tools:
             if tool.name == tool_name:
                 return tool.inputSchema
-        return None 
+        return None
     
+    def get_tool_validator(self, tool_name: str) -> Optional[SchemaValidator]:
+        """
+        Get the compiled argument validator for a tool
+        
+        The tool's input schema is compiled on first use and cached.
+        
+        Parameters:
+            tool_name: Tool name
+            
+        Returns:
+            Optional[SchemaValidator]: Validator, or None if the tool has no schema
+        """
+        validator = self._validators.get(tool_name)
+        if validator is None:
+            schema = self.get_tool_schema(tool_name)
+            if not schema:
+                return None
+            validator = SchemaValidator(schema, tool_name)
+            self._validators[tool_name] = validator
+        return validator
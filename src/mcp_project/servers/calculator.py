@@ -2,8 +2,8 @@
 """
 Calculator Server Example
 """
+import math
 from mcp.server.fastmcp import FastMCP
-import numpy as np
 # Create MCP server
 mcp = FastMCP("Calculator")
 
@@ -33,7 +33,7 @@ def multiply(numbers: list[float]) -> float:
     Returns:
         Product of all numbers
     """
-    return np.prod(numbers)
+    return math.prod(numbers)
 
 
 @mcp.tool()
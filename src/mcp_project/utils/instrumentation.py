@@ -0,0 +1,402 @@
+"""
+Instrumentation Module
+
+Lightweight tracing and metrics for the query/tool pipeline.
+
+Code under measurement wraps work in ``instrumentation.span(...)``. Every
+finished span updates an in-memory latency histogram (labelled by the
+span's ``labels``) and is handed to the configured span exporters. Metrics
+can be rendered in the Prometheus text format, written to a file, or served
+over HTTP.
+"""
+import abc
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# The span that is currently running in this task, used for parent links
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("mcp_current_span", default=None)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Span:
+    """A single timed operation"""
+
+    def __init__(self, name: str, labels: Dict[str, str], attributes: Dict[str, Any], parent: Optional["Span"]):
+        self.name = name
+        self.labels = labels
+        self.attributes = attributes
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start_time = time.time()
+        self.duration = 0.0
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def set(self, **attributes):
+        """
+        Add attributes to the span
+
+        Parameters:
+            attributes: Attribute values (token counts, payload sizes, ...)
+        """
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        """
+        Convert the span into a JSON-serializable record
+
+        Returns:
+            dict: Span record
+        """
+        record = {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "labels": self.labels,
+            "attributes": self.attributes,
+        }
+        if self.error:
+            record["error"] = self.error
+        return record
+
+
+class SpanExporter(abc.ABC):
+    """Base class for span exporters"""
+
+    @abc.abstractmethod
+    def export(self, span: Span):
+        """
+        Export a finished span
+
+        Parameters:
+            span: Finished span
+        """
+
+    def close(self):
+        """Flush and release resources"""
+
+
+class JsonlFileExporter(SpanExporter):
+    """Appends finished spans to a JSON Lines file"""
+
+    def __init__(self, path: str):
+        """
+        Open the trace file
+
+        Parameters:
+            path: Path of the JSON Lines file
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Buffered writes keep file I/O off the per-span path
+        self._file = open(path, "a", encoding="utf-8", buffering=64 * 1024)
+
+    def export(self, span: Span):
+        self._file.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """
+        Record a value
+
+        Parameters:
+            value: Observed value
+        """
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def cumulative_counts(self) -> List[int]:
+        """
+        Get counts in Prometheus (cumulative) form
+
+        Returns:
+            List[int]: Number of observations <= each bucket bound
+        """
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+class Instrumentation:
+    """Collects spans, latency histograms and counters"""
+
+    def __init__(self, exporters: Optional[List[SpanExporter]] = None, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize instrumentation
+
+        Parameters:
+            exporters: Span exporters receiving every finished span
+            buckets: Latency histogram bucket bounds in seconds
+        """
+        self.exporters: List[SpanExporter] = list(exporters or [])
+        self.buckets = buckets
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        # Metrics may be read from the Prometheus server thread
+        self._lock = threading.Lock()
+
+    def add_exporter(self, exporter: SpanExporter):
+        """
+        Register a span exporter
+
+        Parameters:
+            exporter: Span exporter
+        """
+        self.exporters.append(exporter)
+
+    @contextmanager
+    def span(self, name: str, labels: Optional[Dict[str, str]] = None, **attributes) -> Iterator[Span]:
+        """
+        Time a block of work
+
+        Parameters:
+            name: Span name, e.g. "tool.call"
+            labels: Low-cardinality labels used for metrics (tool name, server, model)
+            attributes: Extra attributes recorded on the span only
+
+        Returns:
+            Iterator[Span]: The running span, use span.set() to add attributes
+        """
+        span = Span(name, dict(labels or {}), attributes, _current_span.get())
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            _current_span.reset(token)
+            self._finish(span)
+
+    def count(self, name: str, value: float = 1, labels: Optional[Dict[str, str]] = None):
+        """
+        Increment a counter
+
+        Parameters:
+            name: Counter name, e.g. "llm.tokens"
+            value: Amount to add
+            labels: Counter labels
+        """
+        key = _label_key(labels or {})
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def get_histogram(self, name: str, labels: Optional[Dict[str, str]] = None) -> Optional[Histogram]:
+        """
+        Get the latency histogram of a span name and label set
+
+        Parameters:
+            name: Span name
+            labels: Span labels, including the "status" label ("ok" or "error")
+
+        Returns:
+            Optional[Histogram]: Histogram, or None if nothing was recorded
+        """
+        return self._histograms.get(name, {}).get(_label_key(labels or {}))
+
+    def total_seconds(self, name: str) -> float:
+        """
+        Get the summed duration of all spans with a given name
+
+        Parameters:
+            name: Span name
+
+        Returns:
+            float: Total duration in seconds across all label sets
+        """
+        with self._lock:
+            return sum(histogram.sum for histogram in self._histograms.get(name, {}).values())
+
+    def _finish(self, span: Span):
+        """Record a finished span in metrics and hand it to exporters"""
+        labels = dict(span.labels, status=span.status)
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(span.name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(span.duration)
+
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                logger.warning("Span exporter %s failed: %s", type(exporter).__name__, e)
+
+    def render_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format
+
+        Returns:
+            str: Metrics text
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                metric = f"mcp_{_metric_name(name)}_duration_seconds"
+                lines.append(f"# HELP {metric} Duration of {name} spans in seconds")
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in series.items():
+                    labels = dict(key)
+                    for bound, count in zip(histogram.buckets, histogram.cumulative_counts()):
+                        lines.append(f"{metric}_bucket{_format_labels(dict(labels, le=repr(bound)))} {count}")
+                    lines.append(f"{metric}_bucket{_format_labels(dict(labels, le='+Inf'))} {histogram.count}")
+                    lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+            for name, series in sorted(self._counters.items()):
+                metric = f"mcp_{_metric_name(name)}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}{_format_labels(dict(key))} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus_file(self, path: str):
+        """
+        Write metrics to a file (e.g. for the node_exporter textfile collector)
+
+        Parameters:
+            path: Output file path
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(temp_path, path)
+
+    def close(self):
+        """Close all span exporters"""
+        for exporter in self.exporters:
+            exporter.close()
+
+
+def start_prometheus_server(instrumentation: Instrumentation, port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+    """
+    Serve metrics on http://host:port/metrics from a daemon thread
+
+    Parameters:
+        instrumentation: Instrumentation whose metrics are served
+        port: TCP port
+        host: Bind address
+
+    Returns:
+        ThreadingHTTPServer: Running server, call shutdown() to stop it
+    """
+    # http.server is only imported when metrics are actually served
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Serves the Prometheus text format on /metrics"""
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = instrumentation.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug("Metrics request: " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="mcp-metrics", daemon=True)
+    thread.start()
+    logger.info("Serving Prometheus metrics on http://%s:%d/metrics", host, server.server_port)
+    return server
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    """Hashable, order-independent form of a label dict"""
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _metric_name(name: str) -> str:
+    """Convert a span or counter name such as "tool.call" into a metric name"""
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Format labels as {key="value",...}"""
+    if not labels:
+        return ""
+    pairs = (f'{key}="{_escape_label_value(value)}"' for key, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape_label_value(value: Any) -> str:
+    """Escape backslashes, quotes and newlines in a label value"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Shared default instance used when no instrumentation is passed explicitly
+_default_instrumentation = Instrumentation()
+
+
+def get_instrumentation() -> Instrumentation:
+    """
+    Get the shared default instrumentation
+
+    Returns:
+        Instrumentation: Default instance
+    """
+    return _default_instrumentation
+
+
+def set_instrumentation(instrumentation: Instrumentation):
+    """
+    Replace the shared default instrumentation
+
+    Parameters:
+        instrumentation: New default instance
+    """
+    global _default_instrumentation
+    _default_instrumentation = instrumentation
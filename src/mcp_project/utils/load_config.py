@@ -1,16 +1,217 @@
 import json
+import logging
+import math
 import os
-from dotenv import load_dotenv
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+SERVER_TYPES = ("stdio", "in_process")
+
+# Scheduler setting -> (type, smallest allowed value, whether the minimum itself is allowed)
+SCHEDULER_SETTINGS = {
+    "requests_per_minute": (float, 0, False),
+    "tokens_per_minute": (float, 0, False),
+    "max_concurrency": (int, 1, True),
+    "min_concurrency": (int, 1, True),
+    "max_retries": (int, 0, True),
+    "base_delay": (float, 0, True),
+    "max_delay": (float, 0, True),
+    "target_latency": (float, 0, False),
+}
+
+# Resource cache setting -> (type, smallest allowed value, whether the minimum itself is allowed)
+RESOURCE_CACHE_SETTINGS = {
+    "ttl": (float, 0, True),
+    "max_entries": (int, 0, True),
+    "max_bytes": (int, 0, True),
+}
+
+_dotenv_loaded = False
+
+
+class ConfigError(Exception):
+    """Raised when a configuration file is missing or invalid"""
+
+
+class ClientConfig:
+    """Parsed and validated client configuration"""
+
+    def __init__(self, server_config: dict, api_config: dict):
+        """
+        Initialize client configuration
+
+        Parameters:
+            server_config: Validated server configuration dictionary
+            api_config: API configuration dictionary
+        """
+        self.servers = server_config["mcpServers"]
+        self.resource_cache = server_config.get("resourceCache", {})
+        self.api = api_config
+
+
+def load_dotenv_once() -> bool:
+    """
+    Load the .env file on first call, later calls do nothing
+
+    Returns:
+        bool: Whether python-dotenv is available
+    """
+    global _dotenv_loaded
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return False
+
+    if not _dotenv_loaded:
+        load_dotenv()
+        _dotenv_loaded = True
+    return True
+
+
+def load_client_config(server_config_path: str = "config/servers.json",
+                       api_config_path: str = "config/api_config.json") -> ClientConfig:
+    """
+    Read and validate both configuration files once
+
+    Parameters:
+        server_config_path: Path to server configuration file
+        api_config_path: Path to API configuration file
+
+    Returns:
+        ClientConfig: Client configuration
+
+    Raises:
+        ConfigError: If the server configuration or the API scheduler section is invalid
+    """
+    return ClientConfig(load_server_config(server_config_path), load_api_config(api_config_path))
+
+
+def load_server_config(server_config_path: str = "config/servers.json") -> dict:
+        """
+        Load and validate server configuration file
+
+        Returns:
+            dict: Server configuration dictionary
+
+        Raises:
+            ConfigError: If the file is missing or invalid
+        """
+        if not os.path.exists(server_config_path):
+            raise ConfigError(f"Server configuration file {server_config_path} does not exist")
+
+        try:
+            with open(server_config_path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ConfigError(f"Configuration file {server_config_path} is not valid JSON format: {e}")
+        except OSError as e:
+            raise ConfigError(f"Error reading server configuration file: {e}")
+
+        servers = config.get("mcpServers") if isinstance(config, dict) else None
+        if not servers or not isinstance(servers, dict):
+            raise ConfigError(f"Configuration file {server_config_path} is invalid, missing 'mcpServers' section")
+
+        for server_id, server in servers.items():
+            if not isinstance(server, dict):
+                raise ConfigError(f"Server '{server_id}' configuration must be an object")
+            server_type = server.get("type", "stdio")
+            if server_type not in SERVER_TYPES:
+                raise ConfigError(f"Server '{server_id}' has unknown type '{server_type}', expected one of {SERVER_TYPES}")
+            if server_type == "in_process" and not server.get("module"):
+                raise ConfigError(f"In-process server '{server_id}' requires a 'module'")
+            if not isinstance(server.get("offload_sync_tools", True), bool):
+                raise ConfigError(f"Server '{server_id}' 'offload_sync_tools' must be true or false")
+            if not isinstance(server.get("args", []), list):
+                raise ConfigError(f"Server '{server_id}' 'args' must be an array")
+
+        if "resourceCache" in config:
+            config["resourceCache"] = _validate_numbers(
+                config["resourceCache"], RESOURCE_CACHE_SETTINGS, "resourceCache", server_config_path
+            )
+
+        return config
+
+
+def validate_scheduler_config(scheduler: Any, api_config_path: str) -> dict:
+    """
+    Validate the "scheduler" section of the API configuration
+
+    Parameters:
+        scheduler: Scheduler section as read from the file
+        api_config_path: Path of the API configuration file, used in error messages
+
+    Returns:
+        dict: Scheduler settings converted to their expected types
+
+    Raises:
+        ConfigError: If the section is not an object or a setting is invalid
+    """
+    # Rate limits may be null, which means no limit
+    validated = _validate_numbers(scheduler, SCHEDULER_SETTINGS, "scheduler", api_config_path,
+                                  nullable=("requests_per_minute", "tokens_per_minute"))
+    if validated.get("min_concurrency", 1) > validated.get("max_concurrency", 8):
+        raise ConfigError(f"Setting 'scheduler.min_concurrency' in {api_config_path} must not exceed 'scheduler.max_concurrency'")
+    return validated
+
+
+def _validate_numbers(section: Any, settings: dict, section_name: str, config_path: str,
+                      nullable: tuple = ()) -> dict:
+    """
+    Validate a configuration section made of numeric settings
+
+    Parameters:
+        section: Section as read from the file
+        settings: Setting name -> (type, smallest allowed value, whether the minimum itself is allowed)
+        section_name: Name of the section, used in error messages
+        config_path: Path of the configuration file, used in error messages
+        nullable: Settings that may also be null
+
+    Returns:
+        dict: Settings converted to their expected types
+
+    Raises:
+        ConfigError: If the section is not an object or a setting is invalid
+    """
+    if not isinstance(section, dict):
+        raise ConfigError(f"Configuration file {config_path} is invalid, '{section_name}' must be an object")
+
+    validated = {}
+    for key, value in section.items():
+        if key not in settings:
+            raise ConfigError(f"Unknown setting '{section_name}.{key}' in {config_path}, expected one of {tuple(settings)}")
+        expected, minimum, inclusive = settings[key]
+        kind = "whole number" if expected is int else "number"
+        if value is None and key in nullable:
+            validated[key] = None
+            continue
+        # bool is a subclass of int, but true/false is never a meaningful setting
+        if isinstance(value, bool):
+            raise ConfigError(f"Setting '{section_name}.{key}' in {config_path} must be a {kind}, got {value!r}")
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ConfigError(f"Setting '{section_name}.{key}' in {config_path} must be a {kind}, got {value!r}")
+        if not math.isfinite(number) or (expected is int and not number.is_integer()):
+            raise ConfigError(f"Setting '{section_name}.{key}' in {config_path} must be a {kind}, got {value!r}")
+        if number < minimum or (number == minimum and not inclusive):
+            bound = f">= {minimum}" if inclusive else f"> {minimum}"
+            raise ConfigError(f"Setting '{section_name}.{key}' in {config_path} must be {bound}, got {value!r}")
+        validated[key] = expected(number)
+    return validated
 
 
 def load_api_config(api_config_path: str = "config/api_config.json") -> dict:
         """
         Load API configuration file
-        
+
         Returns:
             dict: API configuration dictionary
+
+        Raises:
+            ConfigError: If the scheduler section is invalid
         """
-        load_dotenv()
+        load_dotenv_once()
         # Default configuration
         default_config = {
             "openai_api": {
@@ -25,21 +226,39 @@ def load_api_config(api_config_path: str = "config/api_config.json") -> dict:
                 }
             }
         }
-        
+
         try:
             if os.path.exists(api_config_path):
                 with open(api_config_path, "r", encoding="utf-8") as f:
                     config = json.load(f)
-                    
+
+                    if not isinstance(config.get("openai_api"), dict):
+                        logger.warning("API configuration file %s is invalid, missing 'openai_api' section, will use environment variables or default settings", api_config_path)
+                        return default_config
+
                     # If API key is empty in configuration, use environment variable
-                    if not config.get("openai_api", {}).get("api_key"):
+                    if not config["openai_api"].get("api_key"):
+                        if os.getenv("OPENAI_API_KEY"):
+                            logger.info("API key is empty in configuration file, will use OPENAI_API_KEY environment variable")
+                        else:
+                            logger.warning("API key is empty in configuration file and OPENAI_API_KEY environment variable is not set")
                         config["openai_api"]["api_key"] = os.getenv("OPENAI_API_KEY", "")
-                    
+
+                    if "scheduler" in config["openai_api"]:
+                        config["openai_api"]["scheduler"] = validate_scheduler_config(
+                            config["openai_api"]["scheduler"], api_config_path
+                        )
+
                     return config
             else:
-                print(f"Warning: API configuration file {api_config_path} does not exist, will use environment variables or default settings")
+                logger.warning("API configuration file %s does not exist, will use environment variables or default settings", api_config_path)
                 return default_config
-                
+
+        except ConfigError:
+            raise
+        except json.JSONDecodeError:
+            logger.warning("API configuration file %s is not valid JSON format, will use environment variables or default settings", api_config_path)
+            return default_config
         except Exception as e:
-            print(f"Error loading API configuration file: {str(e)}, will use environment variables or default settings")
-            return default_config
\ No newline at end of file
+            logger.error("Error loading API configuration file: %s, will use environment variables or default settings", e)
+            return default_config
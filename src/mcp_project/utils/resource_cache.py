@@ -0,0 +1,120 @@
+"""
+Resource Content Cache Module
+
+A small LRU cache for resource read results, keyed by URI, with a
+time-to-live and limits on both entry count and total content size.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def content_size(result: Any) -> int:
+    """
+    Compute the size of a resource read result in bytes
+
+    Parameters:
+        result: ReadResourceResult (or any object with a ``contents`` list)
+
+    Returns:
+        int: UTF-8 size of all text contents plus decoded size of all blob contents
+    """
+    size = 0
+    for content in getattr(result, "contents", None) or []:
+        text = getattr(content, "text", None)
+        if text is not None:
+            size += len(text.encode("utf-8"))
+            continue
+        blob = getattr(content, "blob", None) or ""
+        # Decoded size of base64 data, without decoding it
+        size += len(blob) * 3 // 4 - len(blob) + len(blob.rstrip("="))
+    return size
+
+
+class ResourceCache:
+    """LRU cache with TTL and size eviction for resource contents"""
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 128, max_bytes: int = 4 * 1024 * 1024):
+        """
+        Initialize the cache
+
+        Parameters:
+            ttl: Seconds an entry stays valid (0 disables caching)
+            max_entries: Maximum number of cached URIs
+            max_bytes: Maximum total content size of all entries in bytes
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        # uri -> (expires_at, size, result), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, uri: str) -> Optional[Any]:
+        """
+        Get a cached result
+
+        Parameters:
+            uri: Resource URI
+
+        Returns:
+            Optional[Any]: Cached result, or None if missing or expired
+        """
+        entry = self._entries.get(uri)
+        if entry is None:
+            return None
+
+        expires_at, _, result = entry
+        if time.monotonic() >= expires_at:
+            self._remove(uri)
+            return None
+
+        self._entries.move_to_end(uri)
+        return result
+
+    def put(self, uri: str, result: Any):
+        """
+        Store a result, evicting least recently used entries as needed
+
+        Parameters:
+            uri: Resource URI
+            result: Resource read result
+        """
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+
+        size = content_size(result)
+        # Never let a single oversized entry flush the whole cache
+        if size > self.max_bytes:
+            return
+
+        if uri in self._entries:
+            self._remove(uri)
+
+        self._entries[uri] = (time.monotonic() + self.ttl, size, result)
+        self.total_bytes += size
+
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def invalidate(self, uri: Optional[str] = None):
+        """
+        Drop one entry, or the whole cache if no URI is given
+
+        Parameters:
+            uri: Resource URI
+        """
+        if uri is None:
+            self._entries.clear()
+            self.total_bytes = 0
+        elif uri in self._entries:
+            self._remove(uri)
+
+    def _remove(self, uri: str):
+        """Remove an entry and update the size total"""
+        _, size, _ = self._entries.pop(uri)
+        self.total_bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
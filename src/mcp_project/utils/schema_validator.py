@@ -0,0 +1,404 @@
+"""
+Tool Argument Schema Validation Module
+
+Compiles a tool's JSON ``inputSchema`` once into a tree of small check
+functions, so arguments produced by the model can be validated (and lightly
+coerced) on the client before any request is sent to a server.
+
+Only the subset of JSON Schema that FastMCP generates is checked: ``type``,
+``properties``, ``required``, ``additionalProperties``, ``items``, ``enum``,
+``const``, ``anyOf``/``oneOf``/``allOf``, local ``$ref`` and the common
+length/range bounds. Unknown keywords are ignored.
+"""
+import json
+import math
+import re
+from typing import Any, Callable, Dict, List, Optional, Union
+
+# Number syntax from the JSON grammar (RFC 8259)
+_JSON_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?")
+_JSON_INTEGER = re.compile(r"-?(?:0|[1-9][0-9]*)")
+
+# A compiled check takes (value, path, errors) and returns the (possibly coerced) value
+Check = Callable[[Any, str, List[str]], Any]
+
+
+class ToolArgumentError(ValueError):
+    """Raised when tool arguments do not match the tool's input schema"""
+
+    def __init__(self, tool_name: str, errors: List[str]):
+        self.tool_name = tool_name
+        self.errors = errors
+        super().__init__(f"Invalid arguments for tool '{tool_name}': " + "; ".join(errors))
+
+
+def _describe(value: Any) -> str:
+    """Short type-and-value description used in error messages"""
+    if value is None:
+        return "null"
+    text = repr(value)
+    if len(text) > 40:
+        text = text[:37] + "..."
+    return f"{_json_type(value)} {text}"
+
+
+def _json_type(value: Any) -> str:
+    """Name of the JSON type of a Python value"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, dict):
+        return "object"
+    return type(value).__name__
+
+
+def _parse_json_number(text: str) -> Optional[Union[int, float]]:
+    """
+    Parse a string holding a plain JSON number
+
+    Python spellings such as "nan", "inf", "0x10" or "1_000" are rejected, and
+    so are numbers too large for a float (e.g. "1e999"), since neither can be
+    sent on as valid JSON.
+
+    Parameters:
+        text: String produced by the model
+
+    Returns:
+        Optional[Union[int, float]]: Parsed number, or None if the string is not a finite JSON number
+    """
+    text = text.strip()
+    if not _JSON_NUMBER.fullmatch(text):
+        return None
+    if _JSON_INTEGER.fullmatch(text):
+        return int(text)
+    number = float(text)
+    return number if math.isfinite(number) else None
+
+
+def _coerce(value: Any, expected: str) -> tuple:
+    """
+    Convert a value to the expected JSON type, fixing common LLM mistakes
+
+    Parameters:
+        value: Value produced by the model
+        expected: JSON type name
+
+    Returns:
+        tuple: (success, coerced value)
+    """
+    is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    if expected == "string":
+        if isinstance(value, str):
+            return True, value
+        if is_number:
+            return True, str(value)
+        return False, value
+
+    if expected == "number":
+        if is_number:
+            # json.loads accepts NaN and Infinity, which no server can handle
+            return math.isfinite(value), value
+        if isinstance(value, str):
+            number = _parse_json_number(value)
+            if number is not None:
+                return True, number
+        return False, value
+
+    if expected == "integer":
+        if isinstance(value, int) and not isinstance(value, bool):
+            return True, value
+        if isinstance(value, float) and value.is_integer():
+            return True, int(value)
+        if isinstance(value, str):
+            number = _parse_json_number(value)
+            if number is not None and float(number).is_integer():
+                return True, int(number)
+        return False, value
+
+    if expected == "boolean":
+        if isinstance(value, bool):
+            return True, value
+        if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+            return True, value.strip().lower() == "true"
+        return False, value
+
+    if expected == "null":
+        return value is None, value
+
+    if expected in ("array", "object"):
+        container = list if expected == "array" else dict
+        if isinstance(value, container):
+            return True, value
+        # Models sometimes send nested structures as JSON-encoded strings
+        if isinstance(value, str):
+            try:
+                decoded = json.loads(value)
+            except ValueError:
+                return False, value
+            if isinstance(decoded, container):
+                return True, decoded
+        return False, value
+
+    # Unknown type names are not checked
+    return True, value
+
+
+class SchemaValidator:
+    """Compiled validator for a single JSON schema"""
+
+    def __init__(self, schema: dict, name: str = ""):
+        """
+        Compile a schema
+
+        Parameters:
+            schema: JSON schema (usually a tool's inputSchema)
+            name: Name used in error messages (usually the tool name)
+        """
+        self.name = name
+        self._root = schema or {}
+        self._refs: Dict[str, Check] = {}
+        self._check = self._compile(self._root)
+
+    def validate(self, arguments: Any) -> Any:
+        """
+        Validate and coerce arguments
+
+        Parameters:
+            arguments: Arguments decoded from the model's tool call
+
+        Returns:
+            Any: Arguments with coercions applied
+
+        Raises:
+            ToolArgumentError: If the arguments violate the schema
+        """
+        errors: List[str] = []
+        result = self._check(arguments, "", errors)
+        if errors:
+            raise ToolArgumentError(self.name, errors)
+        return result
+
+    def _compile(self, schema: Any) -> Check:
+        """Compile a schema node into a check function"""
+        if not isinstance(schema, dict):
+            return lambda value, path, errors: value
+
+        if "$ref" in schema:
+            return self._compile_ref(schema["$ref"])
+
+        checks: List[Check] = []
+
+        if "type" in schema:
+            checks.append(self._compile_type(schema["type"]))
+        if "enum" in schema:
+            checks.append(self._compile_enum(schema["enum"]))
+        if "const" in schema:
+            checks.append(self._compile_enum([schema["const"]]))
+        if "properties" in schema or "required" in schema or "additionalProperties" in schema:
+            checks.append(self._compile_object(schema))
+        if "items" in schema or "minItems" in schema or "maxItems" in schema:
+            checks.append(self._compile_array(schema))
+        if any(key in schema for key in ("minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum")):
+            checks.append(self._compile_range(schema))
+        if "minLength" in schema or "maxLength" in schema:
+            checks.append(self._compile_length(schema))
+        for key in ("anyOf", "oneOf"):
+            if key in schema:
+                checks.append(self._compile_any_of(schema[key]))
+        if "allOf" in schema:
+            checks.extend(self._compile(sub) for sub in schema["allOf"])
+
+        def check(value, path, errors):
+            for step in checks:
+                count = len(errors)
+                value = step(value, path, errors)
+                # Later checks would only repeat the same failure
+                if len(errors) > count:
+                    break
+            return value
+
+        return check
+
+    def _compile_ref(self, ref: str) -> Check:
+        """Resolve a local $ref lazily so recursive definitions work"""
+        def check(value, path, errors):
+            if ref not in self._refs:
+                self._refs[ref] = self._compile(self._resolve(ref))
+            return self._refs[ref](value, path, errors)
+        return check
+
+    def _resolve(self, ref: str) -> Any:
+        """Look up a '#/...' JSON pointer in the root schema"""
+        if not ref.startswith("#"):
+            return {}
+        node: Any = self._root
+        for part in ref.lstrip("#").strip("/").split("/"):
+            if not part:
+                continue
+            part = part.replace("~1", "/").replace("~0", "~")
+            if not isinstance(node, dict) or part not in node:
+                return {}
+            node = node[part]
+        return node
+
+    def _compile_type(self, expected: Any) -> Check:
+        """Check (and coerce) the JSON type"""
+        types = expected if isinstance(expected, list) else [expected]
+        label = " or ".join(types)
+
+        def check(value, path, errors):
+            # Prefer an exact match before trying coercions
+            for name in types:
+                ok, coerced = _coerce(value, name)
+                if ok and _json_type(coerced) == _json_type(value):
+                    return coerced
+            for name in types:
+                ok, coerced = _coerce(value, name)
+                if ok:
+                    return coerced
+            errors.append(f"{path or 'arguments'}: expected {label}, got {_describe(value)}")
+            return value
+
+        return check
+
+    def _compile_enum(self, options: list) -> Check:
+        """Check membership in a fixed set of values"""
+        def check(value, path, errors):
+            # True == 1 in Python, but JSON booleans and numbers never compare equal
+            if any(value == option and isinstance(value, bool) == isinstance(option, bool) for option in options):
+                return value
+            # Allow "1" for an enum of [1, 2, 3] and the like
+            for option in options:
+                ok, coerced = _coerce(value, _json_type(option))
+                if ok and coerced == option:
+                    return option
+            errors.append(f"{path or 'arguments'}: {_describe(value)} is not one of {options}")
+            return value
+        return check
+
+    def _compile_object(self, schema: dict) -> Check:
+        """Check properties, required keys and additional properties"""
+        properties = {key: self._compile(sub) for key, sub in schema.get("properties", {}).items()}
+        required = schema.get("required", [])
+        additional = schema.get("additionalProperties", True)
+        additional_check = self._compile(additional) if isinstance(additional, dict) else None
+
+        def check(value, path, errors):
+            if not isinstance(value, dict):
+                return value
+            result = {}
+            for key in required:
+                if key not in value:
+                    errors.append(f"{path + '.' if path else ''}{key}: missing required argument")
+            for key, item in value.items():
+                item_path = f"{path}.{key}" if path else key
+                if key in properties:
+                    result[key] = properties[key](item, item_path, errors)
+                elif additional_check:
+                    result[key] = additional_check(item, item_path, errors)
+                elif additional is False:
+                    allowed = ", ".join(properties) or "none"
+                    errors.append(f"{item_path}: unexpected argument (allowed: {allowed})")
+                else:
+                    result[key] = item
+            return result
+
+        return check
+
+    def _compile_array(self, schema: dict) -> Check:
+        """Check items and length bounds of an array"""
+        items = schema.get("items")
+        item_check = self._compile(items) if isinstance(items, dict) else None
+        min_items = schema.get("minItems")
+        max_items = schema.get("maxItems")
+
+        def check(value, path, errors):
+            if not isinstance(value, list):
+                return value
+            label = path or "arguments"
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{label}: expected at least {min_items} items, got {len(value)}")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{label}: expected at most {max_items} items, got {len(value)}")
+            if item_check is None:
+                return value
+            return [item_check(item, f"{path}[{index}]", errors) for index, item in enumerate(value)]
+
+        return check
+
+    def _compile_range(self, schema: dict) -> Check:
+        """Check numeric bounds"""
+        bounds = [
+            ("minimum", lambda v, b: v >= b, ">="),
+            ("maximum", lambda v, b: v <= b, "<="),
+            ("exclusiveMinimum", lambda v, b: v > b, ">"),
+            ("exclusiveMaximum", lambda v, b: v < b, "<"),
+        ]
+        active = [(schema[key], test, symbol) for key, test, symbol in bounds if key in schema]
+
+        def check(value, path, errors):
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return value
+            for bound, test, symbol in active:
+                if not test(value, bound):
+                    errors.append(f"{path or 'arguments'}: expected a value {symbol} {bound}, got {value}")
+            return value
+
+        return check
+
+    def _compile_length(self, schema: dict) -> Check:
+        """Check string length bounds"""
+        min_length = schema.get("minLength")
+        max_length = schema.get("maxLength")
+
+        def check(value, path, errors):
+            if not isinstance(value, str):
+                return value
+            if min_length is not None and len(value) < min_length:
+                errors.append(f"{path or 'arguments'}: expected at least {min_length} characters, got {len(value)}")
+            if max_length is not None and len(value) > max_length:
+                errors.append(f"{path or 'arguments'}: expected at most {max_length} characters, got {len(value)}")
+            return value
+
+        return check
+
+    def _compile_any_of(self, options: list) -> Check:
+        """Accept the first alternative the value satisfies"""
+        compiled = [self._compile(option) for option in options]
+
+        def check(value, path, errors):
+            messages = []
+            matches = []
+            for option in compiled:
+                option_errors: List[str] = []
+                result = option(value, path, option_errors)
+                if not option_errors:
+                    # An alternative that needs no type coercion wins outright
+                    if _json_type(result) == _json_type(value):
+                        return result
+                    matches.append(result)
+                messages.extend(option_errors)
+            if matches:
+                return matches[0]
+            label = path or "arguments"
+            prefix = f"{label}: expected "
+            suffix = f", got {_describe(value)}"
+            if messages and all(m.startswith(prefix) and m.endswith(suffix) for m in messages):
+                # Merge plain type mismatches into one "expected A or B" message
+                expected = [m[len(prefix):-len(suffix)] for m in messages]
+                errors.append(f"{prefix}{' or '.join(dict.fromkeys(expected))}{suffix}")
+            else:
+                errors.append(" or ".join(dict.fromkeys(messages)) or f"{label}: no schema alternative matched")
+            return value
+
+        return check
@@ -0,0 +1,149 @@
+"""
+Tests for spans, histograms and the Prometheus renderer
+"""
+import json
+
+import pytest
+
+from src.mcp_project.utils import instrumentation as instrumentation_module
+from src.mcp_project.utils.instrumentation import (
+    Histogram, Instrumentation, JsonlFileExporter, SpanExporter
+)
+
+
+class ListExporter(SpanExporter):
+    """Keeps finished spans in memory"""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def metric_lines(text: str, prefix: str) -> list:
+    """Sample lines of a rendered metric, without HELP/TYPE comments"""
+    return [line for line in text.splitlines() if line.startswith(prefix)]
+
+
+class TestHistogram:
+    def test_cumulative_counts(self):
+        histogram = Histogram(buckets=(0.1, 1.0, 10.0))
+        for value in (0.05, 0.1, 0.5, 5.0, 50.0):
+            histogram.observe(value)
+        assert histogram.counts == [2, 1, 1]
+        assert histogram.cumulative_counts() == [2, 3, 4]
+        assert histogram.count == 5
+        assert histogram.sum == pytest.approx(55.65)
+
+
+class TestRenderPrometheus:
+    def test_histogram_buckets_are_cumulative_and_end_with_inf(self, monkeypatch):
+        # Each span reads the clock twice, giving durations of 0.05, 0.5 and 5 seconds
+        ticks = iter([0.0, 0.05, 10.0, 10.5, 20.0, 25.0])
+        monkeypatch.setattr(instrumentation_module.time, "perf_counter", lambda: next(ticks))
+        instrumentation = Instrumentation(buckets=(0.1, 1.0))
+        for _ in range(3):
+            with instrumentation.span("tool.call"):
+                pass
+
+        text = instrumentation.render_prometheus()
+        assert "# TYPE mcp_tool_call_duration_seconds histogram" in text
+        assert metric_lines(text, "mcp_tool_call_duration_seconds") == [
+            'mcp_tool_call_duration_seconds_bucket{status="ok",le="0.1"} 1',
+            'mcp_tool_call_duration_seconds_bucket{status="ok",le="1.0"} 2',
+            'mcp_tool_call_duration_seconds_bucket{status="ok",le="+Inf"} 3',
+            'mcp_tool_call_duration_seconds_sum{status="ok"} 5.55',
+            'mcp_tool_call_duration_seconds_count{status="ok"} 3',
+        ]
+
+    def test_counters_are_rendered_with_total_suffix(self):
+        instrumentation = Instrumentation()
+        instrumentation.count("llm.tokens", 10, labels={"model": "gpt"})
+        instrumentation.count("llm.tokens", 5, labels={"model": "gpt"})
+        text = instrumentation.render_prometheus()
+        assert "# TYPE mcp_llm_tokens_total counter" in text
+        assert metric_lines(text, "mcp_llm_tokens_total") == ['mcp_llm_tokens_total{model="gpt"} 15']
+
+    def test_label_values_are_escaped(self):
+        instrumentation = Instrumentation()
+        instrumentation.count("tool.errors", labels={"tool": 'say "hi"\\now\nplease'})
+        text = instrumentation.render_prometheus()
+        assert metric_lines(text, "mcp_tool_errors_total") == [
+            'mcp_tool_errors_total{tool="say \\"hi\\"\\\\now\\nplease"} 1'
+        ]
+
+    def test_empty_instrumentation(self):
+        assert Instrumentation().render_prometheus() == "\n"
+
+
+class TestSpan:
+    def test_successful_span(self):
+        exporter = ListExporter()
+        instrumentation = Instrumentation(exporters=[exporter])
+        with instrumentation.span("tool.call", labels={"tool": "add"}) as span:
+            span.set(payload_bytes=3)
+
+        assert len(exporter.spans) == 1
+        record = exporter.spans[0].to_dict()
+        assert record["status"] == "ok"
+        assert "error" not in record
+        assert record["attributes"] == {"payload_bytes": 3}
+        assert instrumentation.get_histogram("tool.call", {"tool": "add", "status": "ok"}).count == 1
+
+    def test_exception_marks_the_span_as_error(self):
+        exporter = ListExporter()
+        instrumentation = Instrumentation(exporters=[exporter])
+        with pytest.raises(ValueError):
+            with instrumentation.span("tool.call", labels={"tool": "add"}):
+                raise ValueError("bad input")
+
+        span = exporter.spans[0]
+        assert span.status == "error"
+        assert span.error == "ValueError: bad input"
+        assert instrumentation.get_histogram("tool.call", {"tool": "add", "status": "error"}).count == 1
+        assert instrumentation.get_histogram("tool.call", {"tool": "add", "status": "ok"}) is None
+        assert 'status="error"' in instrumentation.render_prometheus()
+
+    def test_nested_spans_share_the_trace(self):
+        exporter = ListExporter()
+        instrumentation = Instrumentation(exporters=[exporter])
+        with instrumentation.span("query") as outer:
+            with instrumentation.span("tool.call") as inner:
+                pass
+
+        assert inner.trace_id == outer.trace_id
+        assert inner.parent_id == outer.span_id
+        assert outer.parent_id is None
+
+    def test_failing_exporter_does_not_break_the_caller(self):
+        class BrokenExporter(SpanExporter):
+            def export(self, span):
+                raise OSError("disk full")
+
+        exporter = ListExporter()
+        instrumentation = Instrumentation(exporters=[BrokenExporter(), exporter])
+        with instrumentation.span("tool.call"):
+            pass
+        assert len(exporter.spans) == 1
+
+
+class TestExporters:
+    def test_exporter_must_implement_export(self):
+        class IncompleteExporter(SpanExporter):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteExporter()
+
+    def test_jsonl_file_exporter(self, tmp_path):
+        path = tmp_path / "traces" / "spans.jsonl"
+        exporter = JsonlFileExporter(str(path))
+        instrumentation = Instrumentation(exporters=[exporter])
+        with instrumentation.span("tool.call", labels={"tool": "add"}):
+            pass
+        instrumentation.close()
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [record["name"] for record in records] == ["tool.call"]
+        assert records[0]["labels"] == {"tool": "add"}
@@ -0,0 +1,269 @@
+"""
+Tests for the LLM request scheduler: backoff, retries, token accounting and
+adaptive (AIMD) concurrency
+"""
+import asyncio
+import email.utils
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.mcp_project.core import llm_scheduler
+from src.mcp_project.core.llm_scheduler import LLMScheduler, _parse_retry_after, _retry_decision
+from src.mcp_project.utils.instrumentation import Instrumentation
+from src.mcp_project.utils.load_config import ConfigError, validate_scheduler_config
+
+
+class StatusError(Exception):
+    """Stand-in for an openai.APIStatusError"""
+
+    def __init__(self, status_code: int, headers: dict = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def make_scheduler(**kwargs) -> LLMScheduler:
+    """Scheduler with near-zero backoff and private instrumentation"""
+    kwargs.setdefault("base_delay", 0.001)
+    kwargs.setdefault("max_delay", 0.001)
+    return LLMScheduler(instrumentation=Instrumentation(), **kwargs)
+
+
+def failing_then(failures: list, result="ok"):
+    """Request raising the given exceptions in turn, then returning result"""
+    remaining = list(failures)
+    calls = []
+
+    def request():
+        calls.append(time.monotonic())
+        if remaining:
+            raise remaining.pop(0)
+        return result
+
+    request.calls = calls
+    return request
+
+
+class TestBackoff:
+    def test_delay_doubles_up_to_max_delay(self, monkeypatch):
+        # Full jitter draws from [0, cap]; take the upper end to see the cap
+        monkeypatch.setattr(llm_scheduler.random, "uniform", lambda low, high: high)
+        scheduler = LLMScheduler(base_delay=1.0, max_delay=5.0, instrumentation=Instrumentation())
+        assert [scheduler._backoff_delay(attempt, None) for attempt in range(5)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+    def test_delay_is_jittered_from_zero(self, monkeypatch):
+        bounds = []
+        monkeypatch.setattr(llm_scheduler.random, "uniform", lambda low, high: bounds.append((low, high)) or low)
+        scheduler = LLMScheduler(base_delay=0.5, instrumentation=Instrumentation())
+        assert scheduler._backoff_delay(2, None) == 0
+        assert bounds == [(0, 2.0)]
+
+    def test_retry_after_is_a_lower_bound(self, monkeypatch):
+        monkeypatch.setattr(llm_scheduler.random, "uniform", lambda low, high: low)
+        scheduler = LLMScheduler(base_delay=1.0, max_delay=2.0, instrumentation=Instrumentation())
+        assert scheduler._backoff_delay(0, 7.5) == 7.5
+
+
+class TestRetryDecision:
+    @pytest.mark.parametrize("status", [408, 409, 429, 500, 502, 503, 504])
+    def test_transient_statuses_are_retried(self, status):
+        assert _retry_decision(StatusError(status)) == (True, None)
+
+    @pytest.mark.parametrize("status", [400, 401, 403, 404, 422])
+    def test_client_errors_are_not_retried(self, status):
+        assert _retry_decision(StatusError(status, {"retry-after": "5"})) == (False, None)
+
+    def test_retry_after_is_read_from_the_response(self):
+        assert _retry_decision(StatusError(429, {"retry-after": "3"})) == (True, 3.0)
+
+    def test_connection_errors_are_retried(self):
+        assert _retry_decision(ConnectionResetError()) == (True, None)
+        assert _retry_decision(TimeoutError()) == (True, None)
+
+    def test_other_exceptions_are_not_retried(self):
+        assert _retry_decision(ValueError("bad")) == (False, None)
+
+
+class TestParseRetryAfter:
+    def test_milliseconds_take_precedence(self):
+        assert _parse_retry_after({"retry-after-ms": "250", "retry-after": "9"}) == 0.25
+
+    def test_seconds(self):
+        assert _parse_retry_after({"retry-after": "2"}) == 2.0
+
+    def test_http_date(self):
+        value = email.utils.formatdate(time.time() + 30, usegmt=True)
+        assert 28 <= _parse_retry_after({"retry-after": value}) <= 30
+
+    def test_past_date_and_negative_values_become_zero(self):
+        assert _parse_retry_after({"retry-after": email.utils.formatdate(0, usegmt=True)}) == 0.0
+        assert _parse_retry_after({"retry-after": "-4"}) == 0.0
+
+    def test_missing_or_invalid(self):
+        assert _parse_retry_after(None) is None
+        assert _parse_retry_after({}) is None
+        assert _parse_retry_after({"retry-after": "soon"}) is None
+
+
+class TestAdaptiveConcurrency:
+    def test_failure_halves_the_limit(self):
+        scheduler = make_scheduler(max_concurrency=8)
+        scheduler._adapt(0.1, failed=True)
+        assert scheduler.concurrency_limit == 4
+        scheduler._adapt(0.1, failed=True)
+        assert scheduler.concurrency_limit == 2
+
+    def test_limit_never_drops_below_min_concurrency(self):
+        scheduler = make_scheduler(max_concurrency=8, min_concurrency=3)
+        for _ in range(5):
+            scheduler._adapt(0.1, failed=True)
+        assert scheduler.concurrency_limit == 3
+
+    def test_slow_response_decreases_by_one(self):
+        scheduler = make_scheduler(max_concurrency=8, target_latency=1.0)
+        scheduler._adapt(2.0, failed=False)
+        assert scheduler.concurrency_limit == 7
+
+    def test_one_step_up_per_window_of_successes(self):
+        scheduler = make_scheduler(max_concurrency=8)
+        scheduler.concurrency_limit = 2
+        scheduler._adapt(0.1, failed=False)
+        assert scheduler.concurrency_limit == 2
+        scheduler._adapt(0.1, failed=False)
+        assert scheduler.concurrency_limit == 3
+        # The window grows with the limit
+        for _ in range(2):
+            scheduler._adapt(0.1, failed=False)
+        assert scheduler.concurrency_limit == 3
+        scheduler._adapt(0.1, failed=False)
+        assert scheduler.concurrency_limit == 4
+
+    def test_failure_resets_the_success_window(self):
+        scheduler = make_scheduler(max_concurrency=8)
+        scheduler.concurrency_limit = 4
+        for _ in range(3):
+            scheduler._adapt(0.1, failed=False)
+        scheduler._adapt(0.1, failed=True)
+        assert scheduler.concurrency_limit == 2
+        # Successes before the failure no longer count towards the next step
+        scheduler._adapt(0.1, failed=False)
+        assert scheduler.concurrency_limit == 2
+
+    def test_limit_never_exceeds_max_concurrency(self):
+        scheduler = make_scheduler(max_concurrency=2)
+        for _ in range(10):
+            scheduler._adapt(0.1, failed=False)
+        assert scheduler.concurrency_limit == 2
+
+    def test_requests_in_flight_stay_within_the_limit(self):
+        scheduler = make_scheduler(max_concurrency=3)
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def request():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+            return "ok"
+
+        async def run():
+            await asyncio.gather(*(scheduler.submit(request) for _ in range(9)))
+
+        asyncio.run(run())
+        assert max(peak) == 3
+        assert scheduler.in_flight == 0
+
+
+class TestSubmit:
+    def test_retryable_errors_are_retried_and_halve_the_limit(self):
+        scheduler = make_scheduler(max_concurrency=8, max_retries=3)
+        request = failing_then([StatusError(429), StatusError(503)])
+        assert asyncio.run(scheduler.submit(request)) == "ok"
+        assert len(request.calls) == 3
+        assert scheduler.concurrency_limit == 2
+        assert scheduler.in_flight == 0
+
+    def test_gives_up_after_max_retries(self):
+        scheduler = make_scheduler(max_retries=2)
+        request = failing_then([StatusError(500)] * 5)
+        with pytest.raises(StatusError):
+            asyncio.run(scheduler.submit(request))
+        assert len(request.calls) == 3
+
+    def test_non_retryable_error_is_raised_without_changing_the_limit(self):
+        scheduler = make_scheduler(max_concurrency=8)
+        request = failing_then([StatusError(400)])
+        with pytest.raises(StatusError):
+            asyncio.run(scheduler.submit(request))
+        assert len(request.calls) == 1
+        assert scheduler.concurrency_limit == 8
+        assert scheduler.in_flight == 0
+
+    def test_retry_after_pauses_the_next_attempt(self):
+        scheduler = make_scheduler(max_retries=1)
+        request = failing_then([StatusError(429, {"retry-after-ms": "100"})])
+        asyncio.run(scheduler.submit(request))
+        first, second = request.calls
+        assert second - first >= 0.09
+
+    def test_tokens_are_charged_once_per_request(self):
+        scheduler = make_scheduler(tokens_per_minute=6000, max_retries=3)
+        request = failing_then([StatusError(429)] * 3, result=SimpleNamespace(usage=None))
+        asyncio.run(scheduler.submit(request, estimated_tokens=1000))
+        assert scheduler.token_bucket.tokens == pytest.approx(5000, abs=5)
+
+    def test_tokens_are_refunded_when_the_request_fails(self):
+        scheduler = make_scheduler(tokens_per_minute=6000, max_retries=1)
+        request = failing_then([StatusError(429)] * 2)
+        with pytest.raises(StatusError):
+            asyncio.run(scheduler.submit(request, estimated_tokens=1000))
+        assert scheduler.token_bucket.tokens == pytest.approx(6000)
+
+    def test_reported_usage_corrects_the_estimate(self):
+        scheduler = make_scheduler(tokens_per_minute=6000)
+        response = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=150, completion_tokens=50, total_tokens=200))
+        asyncio.run(scheduler.submit(failing_then([], result=response), estimated_tokens=1000))
+        assert scheduler.token_bucket.tokens == pytest.approx(5800, abs=5)
+
+    def test_llm_call_spans_time_attempts_only(self, monkeypatch):
+        monkeypatch.setattr(llm_scheduler.random, "uniform", lambda low, high: high)
+        scheduler = make_scheduler(base_delay=0.1, max_delay=0.1, max_retries=1)
+        asyncio.run(scheduler.submit(failing_then([StatusError(503)]), labels={"model": "stub"}))
+        instrumentation = scheduler.instrumentation
+        assert instrumentation.get_histogram("llm.call", {"model": "stub", "status": "error"}).count == 1
+        assert instrumentation.get_histogram("llm.call", {"model": "stub", "status": "ok"}).count == 1
+        # The 0.1 s backoff is waiting, not LLM latency
+        assert instrumentation.total_seconds("llm.wait") >= 0.09
+        assert instrumentation.total_seconds("llm.call") < instrumentation.total_seconds("llm.wait")
+
+
+class TestSchedulerConfig:
+    def test_values_are_converted(self):
+        config = validate_scheduler_config({"max_concurrency": "4", "base_delay": 2, "requests_per_minute": None}, "api.json")
+        assert config == {"max_concurrency": 4, "base_delay": 2.0, "requests_per_minute": None}
+        assert isinstance(config["base_delay"], float)
+
+    @pytest.mark.parametrize("settings", [
+        {"max_concurrency": "eight"},
+        {"max_concurrency": 2.5},
+        {"max_concurrency": 0},
+        {"max_retries": True},
+        {"requests_per_minute": 0},
+        {"base_delay": -1},
+        {"min_concurrency": 4, "max_concurrency": 2},
+        {"max_concurency": 4},
+    ])
+    def test_invalid_settings_raise_config_error(self, settings):
+        with pytest.raises(ConfigError):
+            validate_scheduler_config(settings, "api.json")
+
+    def test_section_must_be_an_object(self):
+        with pytest.raises(ConfigError, match="'scheduler' must be an object"):
+            validate_scheduler_config([], "api.json")
@@ -0,0 +1,154 @@
+"""
+Tests for the resource content cache and the resourceCache settings
+"""
+import base64
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.mcp_project.utils import resource_cache
+from src.mcp_project.utils.load_config import ConfigError, load_server_config
+from src.mcp_project.utils.resource_cache import ResourceCache, content_size
+
+
+def text_result(text: str):
+    """ReadResourceResult-like object with one text content"""
+    return SimpleNamespace(contents=[SimpleNamespace(text=text)])
+
+
+def blob_result(data: bytes):
+    """ReadResourceResult-like object with one base64 blob content"""
+    return SimpleNamespace(contents=[SimpleNamespace(text=None, blob=base64.b64encode(data).decode("ascii"))])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for time.monotonic in the cache module"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(resource_cache.time, "monotonic", lambda: now.value)
+    return now
+
+
+class TestContentSize:
+    def test_text_is_measured_in_utf8_bytes(self):
+        assert content_size(text_result("abc")) == 3
+        assert content_size(text_result("héllo")) == 6
+        assert content_size(text_result("你好")) == 6
+
+    @pytest.mark.parametrize("length", [0, 1, 2, 3, 4, 5, 1000])
+    def test_blob_is_measured_decoded(self, length):
+        assert content_size(blob_result(bytes(length))) == length
+
+    def test_all_contents_are_added_up(self):
+        result = SimpleNamespace(contents=text_result("ab").contents + blob_result(b"xyz").contents)
+        assert content_size(result) == 5
+
+    def test_results_without_contents(self):
+        assert content_size(SimpleNamespace(contents=[])) == 0
+        assert content_size(object()) == 0
+
+
+class TestExpiry:
+    def test_entry_is_served_until_the_ttl_passes(self, clock):
+        cache = ResourceCache(ttl=10)
+        result = text_result("a")
+        cache.put("res://a", result)
+        clock.value += 9.9
+        assert cache.get("res://a") is result
+        clock.value += 0.1
+        assert cache.get("res://a") is None
+        assert len(cache) == 0
+        assert cache.total_bytes == 0
+
+    def test_zero_ttl_disables_caching(self):
+        cache = ResourceCache(ttl=0)
+        cache.put("res://a", text_result("a"))
+        assert cache.get("res://a") is None
+        assert len(cache) == 0
+
+    def test_put_refreshes_the_ttl(self, clock):
+        cache = ResourceCache(ttl=10)
+        cache.put("res://a", text_result("a"))
+        clock.value += 8
+        cache.put("res://a", text_result("b"))
+        clock.value += 8
+        assert cache.get("res://a").contents[0].text == "b"
+
+
+class TestEviction:
+    def test_least_recently_used_entry_is_evicted_first(self):
+        cache = ResourceCache(max_entries=2)
+        cache.put("res://a", text_result("a"))
+        cache.put("res://b", text_result("b"))
+        # Reading a makes b the least recently used entry
+        assert cache.get("res://a") is not None
+        cache.put("res://c", text_result("c"))
+        assert cache.get("res://b") is None
+        assert cache.get("res://a") is not None
+        assert cache.get("res://c") is not None
+
+    def test_entries_are_evicted_to_stay_within_max_bytes(self):
+        cache = ResourceCache(max_bytes=10)
+        cache.put("res://a", text_result("aaaa"))
+        cache.put("res://b", blob_result(b"bbbb"))
+        cache.put("res://c", text_result("cccc"))
+        assert cache.get("res://a") is None
+        assert len(cache) == 2
+        assert cache.total_bytes == 8
+
+    def test_multibyte_text_counts_against_max_bytes(self):
+        cache = ResourceCache(max_bytes=5)
+        cache.put("res://a", text_result("你好"))
+        assert len(cache) == 0
+
+    def test_oversized_entry_does_not_flush_the_cache(self):
+        cache = ResourceCache(max_bytes=10)
+        cache.put("res://a", text_result("aaaa"))
+        cache.put("res://big", text_result("x" * 11))
+        assert cache.get("res://big") is None
+        assert cache.get("res://a") is not None
+
+    def test_replacing_an_entry_updates_the_size_total(self):
+        cache = ResourceCache()
+        cache.put("res://a", text_result("aaaa"))
+        cache.put("res://a", text_result("aa"))
+        assert len(cache) == 1
+        assert cache.total_bytes == 2
+
+    def test_invalidate(self):
+        cache = ResourceCache()
+        cache.put("res://a", text_result("aaaa"))
+        cache.put("res://b", text_result("bb"))
+        cache.invalidate("res://a")
+        assert cache.get("res://a") is None
+        assert cache.total_bytes == 2
+        cache.invalidate()
+        assert len(cache) == 0
+        assert cache.total_bytes == 0
+
+
+class TestResourceCacheSettings:
+    def write_config(self, tmp_path, resource_cache_settings) -> str:
+        path = tmp_path / "servers.json"
+        path.write_text(json.dumps({
+            "mcpServers": {"calculator": {"args": ["calculator.py"]}},
+            "resourceCache": resource_cache_settings,
+        }))
+        return str(path)
+
+    def test_values_are_converted(self, tmp_path):
+        config = load_server_config(self.write_config(tmp_path, {"ttl": "30", "max_entries": 16.0, "max_bytes": 1024}))
+        assert config["resourceCache"] == {"ttl": 30.0, "max_entries": 16, "max_bytes": 1024}
+
+    @pytest.mark.parametrize("settings", [
+        {"ttl": "a minute"},
+        {"ttl": -1},
+        {"max_entries": 1.5},
+        {"max_bytes": True},
+        {"max_entires": 16},
+        [],
+    ])
+    def test_invalid_settings_raise_config_error(self, tmp_path, settings):
+        with pytest.raises(ConfigError):
+            load_server_config(self.write_config(tmp_path, settings))
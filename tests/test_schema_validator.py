@@ -0,0 +1,180 @@
+"""
+Tests for the client-side tool argument validator
+"""
+import pytest
+
+from src.mcp_project.utils.schema_validator import SchemaValidator, ToolArgumentError
+
+
+def validate(schema: dict, arguments):
+    """Compile a schema and validate arguments against it"""
+    return SchemaValidator(schema, "tool").validate(arguments)
+
+
+def object_schema(properties: dict, required=None, **extra) -> dict:
+    """Build an object schema like the ones FastMCP generates"""
+    schema = {"type": "object", "properties": properties, "required": required or list(properties)}
+    schema.update(extra)
+    return schema
+
+
+class TestNumericCoercion:
+    def test_numeric_strings_become_numbers(self):
+        schema = object_schema({"a": {"type": "number"}, "b": {"type": "number"}})
+        assert validate(schema, {"a": "6.5", "b": " 24 "}) == {"a": 6.5, "b": 24}
+
+    def test_integer_accepts_integral_floats_and_strings(self):
+        schema = object_schema({"n": {"type": "integer"}})
+        assert validate(schema, {"n": 3.0}) == {"n": 3}
+        assert validate(schema, {"n": "4"}) == {"n": 4}
+        assert validate(schema, {"n": "5.0"}) == {"n": 5}
+
+    def test_integer_rejects_fractions(self):
+        schema = object_schema({"n": {"type": "integer"}})
+        with pytest.raises(ToolArgumentError, match="n: expected integer"):
+            validate(schema, {"n": 2.5})
+        with pytest.raises(ToolArgumentError, match="n: expected integer"):
+            validate(schema, {"n": "2.5"})
+
+    def test_non_numeric_string_is_rejected(self):
+        schema = object_schema({"a": {"type": "number"}})
+        with pytest.raises(ToolArgumentError) as excinfo:
+            validate(schema, {"a": "six"})
+        assert excinfo.value.errors == ["a: expected number, got string 'six'"]
+
+    @pytest.mark.parametrize("text", ["nan", "NaN", "inf", "-Infinity", "1e999", "1_000", "0x10", "+5", ".5", "5.", "01"])
+    def test_non_json_number_strings_are_rejected(self, text):
+        schema = object_schema({"a": {"type": "number"}, "n": {"anyOf": [{"type": "integer"}, {"type": "null"}]}})
+        with pytest.raises(ToolArgumentError) as excinfo:
+            validate(schema, {"a": text, "n": text})
+        assert len(excinfo.value.errors) == 2
+
+    def test_non_finite_floats_are_rejected(self):
+        # json.loads turns NaN and Infinity literals into floats
+        schema = object_schema({"a": {"type": "number"}, "n": {"type": "integer"}})
+        with pytest.raises(ToolArgumentError) as excinfo:
+            validate(schema, {"a": float("nan"), "n": float("inf")})
+        assert len(excinfo.value.errors) == 2
+
+    def test_json_number_syntax_is_accepted(self):
+        schema = object_schema({"a": {"type": "number"}, "n": {"type": "integer"}})
+        assert validate(schema, {"a": "-1.5e3", "n": "1E2"}) == {"a": -1500.0, "n": 100}
+
+    def test_numbers_become_strings(self):
+        schema = object_schema({"path": {"type": "string"}})
+        assert validate(schema, {"path": 42}) == {"path": "42"}
+
+    def test_array_items_are_coerced(self):
+        schema = object_schema({"numbers": {"type": "array", "items": {"type": "number"}}})
+        assert validate(schema, {"numbers": [1, "2", "3.5"]}) == {"numbers": [1, 2, 3.5]}
+
+    def test_range_is_checked_after_coercion(self):
+        schema = object_schema({"n": {"type": "integer", "minimum": 1}})
+        with pytest.raises(ToolArgumentError, match=r"n: expected a value >= 1, got 0"):
+            validate(schema, {"n": "0"})
+
+
+class TestJsonStringCoercion:
+    def test_json_encoded_array(self):
+        schema = object_schema({"numbers": {"type": "array", "items": {"type": "number"}}})
+        assert validate(schema, {"numbers": "[1, 2, \"3\"]"}) == {"numbers": [1, 2, 3]}
+
+    def test_json_encoded_object(self):
+        schema = object_schema({"options": object_schema({"depth": {"type": "integer"}})})
+        assert validate(schema, {"options": "{\"depth\": \"2\"}"}) == {"options": {"depth": 2}}
+
+    def test_json_of_the_wrong_container_is_rejected(self):
+        schema = object_schema({"numbers": {"type": "array"}})
+        with pytest.raises(ToolArgumentError, match="numbers: expected array"):
+            validate(schema, {"numbers": "{\"a\": 1}"})
+
+    def test_invalid_json_is_rejected(self):
+        schema = object_schema({"numbers": {"type": "array"}})
+        with pytest.raises(ToolArgumentError, match="numbers: expected array"):
+            validate(schema, {"numbers": "[1, 2"})
+
+
+class TestBooleans:
+    def test_bool_is_not_an_integer(self):
+        schema = object_schema({"n": {"type": "integer"}})
+        with pytest.raises(ToolArgumentError, match="n: expected integer, got boolean True"):
+            validate(schema, {"n": True})
+
+    def test_bool_is_not_a_number(self):
+        schema = object_schema({"a": {"type": "number"}})
+        with pytest.raises(ToolArgumentError, match="a: expected number, got boolean False"):
+            validate(schema, {"a": False})
+
+    def test_integer_is_not_a_bool(self):
+        schema = object_schema({"flag": {"type": "boolean"}})
+        with pytest.raises(ToolArgumentError, match="flag: expected boolean, got integer 1"):
+            validate(schema, {"flag": 1})
+
+    def test_boolean_strings_are_coerced(self):
+        schema = object_schema({"flag": {"type": "boolean"}})
+        assert validate(schema, {"flag": "True"}) == {"flag": True}
+        assert validate(schema, {"flag": "false"}) == {"flag": False}
+
+    def test_bool_does_not_match_a_numeric_enum(self):
+        schema = object_schema({"level": {"enum": [0, 1, 2]}})
+        with pytest.raises(ToolArgumentError, match="level: boolean True is not one of"):
+            validate(schema, {"level": True})
+
+
+class TestAnyOf:
+    def test_nullable_accepts_null(self):
+        schema = object_schema({"limit": {"anyOf": [{"type": "integer"}, {"type": "null"}]}})
+        assert validate(schema, {"limit": None}) == {"limit": None}
+
+    def test_nullable_coerces_the_non_null_alternative(self):
+        schema = object_schema({"limit": {"anyOf": [{"type": "integer"}, {"type": "null"}]}})
+        assert validate(schema, {"limit": "10"}) == {"limit": 10}
+
+    def test_exact_type_match_wins_over_coercion(self):
+        # "5" satisfies number by coercion, but it is already a string
+        schema = object_schema({"value": {"anyOf": [{"type": "number"}, {"type": "string"}]}})
+        assert validate(schema, {"value": "5"}) == {"value": "5"}
+        assert validate(schema, {"value": 5}) == {"value": 5}
+
+    def test_type_mismatches_are_merged_into_one_message(self):
+        schema = object_schema({"limit": {"anyOf": [{"type": "integer"}, {"type": "null"}]}})
+        with pytest.raises(ToolArgumentError) as excinfo:
+            validate(schema, {"limit": "many"})
+        assert excinfo.value.errors == ["limit: expected integer or null, got string 'many'"]
+
+    def test_nullable_ref(self):
+        schema = object_schema(
+            {"options": {"anyOf": [{"$ref": "#/$defs/Options"}, {"type": "null"}]}},
+            **{"$defs": {"Options": object_schema({"depth": {"type": "integer"}})}}
+        )
+        assert validate(schema, {"options": {"depth": "3"}}) == {"options": {"depth": 3}}
+        assert validate(schema, {"options": None}) == {"options": None}
+
+
+class TestObjects:
+    def test_additional_properties_false_rejects_unknown_arguments(self):
+        schema = object_schema({"a": {"type": "number"}}, additionalProperties=False)
+        with pytest.raises(ToolArgumentError) as excinfo:
+            validate(schema, {"a": 1, "b": 2})
+        assert excinfo.value.errors == ["b: unexpected argument (allowed: a)"]
+
+    def test_additional_properties_default_passes_unknown_arguments_through(self):
+        schema = object_schema({"a": {"type": "number"}})
+        assert validate(schema, {"a": "1", "b": "2"}) == {"a": 1, "b": "2"}
+
+    def test_additional_properties_schema_is_applied(self):
+        schema = object_schema({}, additionalProperties={"type": "integer"})
+        assert validate(schema, {"x": "1", "y": 2}) == {"x": 1, "y": 2}
+
+    def test_missing_required_argument(self):
+        schema = object_schema({"a": {"type": "number"}, "b": {"type": "number"}})
+        with pytest.raises(ToolArgumentError) as excinfo:
+            validate(schema, {"a": 1})
+        assert excinfo.value.errors == ["b: missing required argument"]
+
+    def test_all_errors_are_reported(self):
+        schema = object_schema({"a": {"type": "number"}, "b": {"type": "number"}}, additionalProperties=False)
+        with pytest.raises(ToolArgumentError) as excinfo:
+            validate(schema, {"a": "x", "c": 1})
+        assert excinfo.value.tool_name == "tool"
+        assert len(excinfo.value.errors) == 3
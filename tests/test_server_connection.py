@@ -0,0 +1,35 @@
+"""
+Tests for resource template matching on server connections
+"""
+import pytest
+
+from src.mcp_project.core.server_connection import _compile_uri_template
+
+
+@pytest.mark.parametrize("template, uri", [
+    ("greeting://{name}", "greeting://alice"),
+    ("weather://{city}/today", "weather://paris/today"),
+    ("repo://{owner}/{name}", "repo://octo/hello-world"),
+    ("file://{+path}", "file://docs/guide/intro.md"),
+    ("config://app", "config://app"),
+])
+def test_matching_uris(template, uri):
+    assert _compile_uri_template(template).fullmatch(uri)
+
+
+@pytest.mark.parametrize("template, uri", [
+    # A plain variable does not span path segments
+    ("greeting://{name}", "greeting://alice/smith"),
+    # Variables match at least one character
+    ("greeting://{name}", "greeting://"),
+    ("weather://{city}/today", "weather://paris/tomorrow"),
+    ("greeting://{name}", "farewell://alice"),
+])
+def test_non_matching_uris(template, uri):
+    assert not _compile_uri_template(template).fullmatch(uri)
+
+
+def test_literal_parts_are_escaped():
+    pattern = _compile_uri_template("data://v1.0/{id}?format=json")
+    assert pattern.fullmatch("data://v1.0/42?format=json")
+    assert not pattern.fullmatch("data://v1x0/42?format=json")